@@ -97,6 +97,10 @@ class CourseService:
     """Actualiza solo la disponibilidad de un curso"""
     return self.course_repository.update_course_availability(sequence, subject, availability)
 
+  def get_data_version(self) -> int:
+    """Versión de los datos de cursos, para invalidar resultados derivados de ellos"""
+    return self.course_repository.get_data_version()
+
   def get_downloaded_periods(self, career: str, plan: str, shift: str = None) -> dict:
     """Obtiene períodos descargados con timestamps para un turno específico"""
     return self.course_repository.get_downloaded_periods(career, plan, shift)
@@ -38,6 +38,11 @@ class CourseRepository(ABC):
     """Actualiza solo la disponibilidad de un curso"""
     pass
   
+  @abstractmethod
+  def get_data_version(self) -> int:
+    """Regresa un contador que cambia cada vez que se modifican los cursos almacenados"""
+    pass
+  
   @abstractmethod
   def get_downloaded_periods(self, career: str, plan: str, shift: str = None) -> Dict[str, float]:
     """Obtiene períodos descargados con sus timestamps para un turno específico"""
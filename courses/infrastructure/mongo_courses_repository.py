@@ -31,6 +31,9 @@ class MongoCourseRepository(CourseRepository):
   Patrón: Singleton para reutilizar la conexión MongoDB.
   """
   
+  # Se incrementa con cada escritura de cursos para invalidar resultados en cache
+  data_version = 0
+  
   def connect(self) -> None:
     self.mongo_client = MongoClient(os.environ['MONGODB_CONNECTION_STRING'])
     self.database = self.mongo_client[os.environ['MONGODB_DATABASE']]
@@ -92,6 +95,7 @@ class MongoCourseRepository(CourseRepository):
         {'$set': course_dict},
         upsert=True
       )
+      self.data_version += 1
       return True
     except Exception as e:
       print(f"Error upserting course: {e}")
@@ -112,11 +116,17 @@ class MongoCourseRepository(CourseRepository):
         {'sequence': sequence, 'subject': subject},
         {'$set': {'course_availability': availability}}
       )
+      if result.modified_count > 0:
+        self.data_version += 1
       return result.modified_count > 0
     except Exception as e:
       print(f"Error updating availability: {e}")
       return False
 
+  def get_data_version(self) -> int:
+    """Versión de los datos de cursos: cambia con cada upsert o actualización de disponibilidad"""
+    return self.data_version
+
   def get_downloaded_periods(self, career: str, plan: str, shift: str = None) -> dict:
     """Obtiene los períodos descargados con sus timestamps para carrera+plan+turno"""
     query = {'career': career, 'plan': plan}
@@ -1,33 +1,147 @@
 # -*- coding: utf-8 -*-
 import sys
 import time
-from typing import List
+import json
+import asyncio
+import threading
+import base64
+import binascii
+import hashlib
+from typing import Callable, List, Optional, Tuple, Union
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import StreamingResponse
 
-from schedules.domain.model.schedule import Schedule
+from schedules.domain.model.schedule import Schedule, ScheduleBatchResult, ScheduleCountResult
 from schemas.schedule import (
     ScheduleGeneratorRequest,
+    ScheduleBatchRequest,
     ScheduleDownloadRequest,
     AvailabilityDownloadRequest,
     ScheduleDownloadResponse,
     AvailabilityDownloadResponse,
     CourseScheduleInfo,
+    SolverPoolStats,
 )
 
 from courses.application.course import CourseService
 from schedules.application.schedule import ScheduleService
+from schedules.application.ranked_schedules import RankedSchedules
+from schedules.application.schedule_query import ScheduleQuery
+from schedules.application.solver_context import SolverContext
 from schedules.application.scraper_service import SAESScraperService
+from schedules.application.solver_pool import SolverPool, SolverQueueFullError
+from schedules.domain.ports.solver_backend import SolverUnavailableError, SearchTooLargeError
+from schedules.infrastructure.cp_sat_solver import CpSatBackend
+from schedules.application.result_cache import ScheduleResultCache
+from utils.text import clean_name
 from routes.login import login_store, LOGIN_TTL_SECONDS
 
 router = APIRouter()
 
+# Número máximo de horarios que se envían por /schedules/stream
+STREAM_MAX_RESULTS = 1000
+
+# Horarios por página de /schedules/
+PAGE_SIZE = 20
+
+# Cache de búsquedas con sus resultados ordenados, también referenciados por los
+# cursores de paginación y por las sesiones que las sirven desde cache
+SCHEDULE_RESULTS_TTL_SECONDS = 600  # 10 minutos
+SCHEDULE_RESULTS_MAX_ENTRIES = 256
+schedule_results_cache = ScheduleResultCache(
+  max_entries=SCHEDULE_RESULTS_MAX_ENTRIES,
+  ttl_seconds=SCHEDULE_RESULTS_TTL_SECONDS
+)
+
+# Última búsqueda de cada sesión, para refinarla sin empezar de cero
+SOLVER_SESSION_TTL_SECONDS = 300  # 5 minutos
+SOLVER_SESSION_MAX_ENTRIES = 256
+solver_sessions = ScheduleResultCache(
+  max_entries=SOLVER_SESSION_MAX_ENTRIES,
+  ttl_seconds=SOLVER_SESSION_TTL_SECONDS
+)
+
+# Universos de cursos compilados (clases de secciones, franjas y conflictos),
+# compartidos por todas las peticiones hasta que cambien los cursos almacenados
+COMPILED_UNIVERSES_TTL_SECONDS = 3600  # 1 hora
+COMPILED_UNIVERSES_MAX_ENTRIES = 64
+compiled_universes = ScheduleResultCache(
+  max_entries=COMPILED_UNIVERSES_MAX_ENTRIES,
+  ttl_seconds=COMPILED_UNIVERSES_TTL_SECONDS
+)
+
+# Pool acotado donde se ejecutan las búsquedas de /schedules/
+solver_pool = SolverPool()
+
+# Motores de búsqueda externos que se registran además de los incluidos en ScheduleService
+solver_backends = [CpSatBackend()]
+
+
+def _canonical_request_key(request: ScheduleGeneratorRequest) -> Tuple:
+  """Forma canónica de la petición: listas ordenadas sin duplicados y nombres normalizados"""
+  return (
+    request.career.value,
+    tuple(sorted({level.value for level in request.levels})),
+    tuple(sorted({semester.value for semester in request.semesters})),
+    request.start_time,
+    request.end_time,
+    request.length,
+    request.credits,
+    request.available_uses,
+    tuple(sorted({clean_name(teacher) for teacher in request.excluded_teachers})),
+    tuple(sorted({clean_name(subject) for subject in request.excluded_subjects})),
+    tuple(sorted({tuple(subject) for subject in request.required_subjects})),
+    tuple(sorted({tuple(subject) for subject in request.extra_subjects})),
+    request.time_budget_ms,
+    request.max_nodes,
+    request.engine.value,
+  )
+
+
+def _encode_cursor(result_id: str, offset: int) -> str:
+  payload = json.dumps({'id': result_id, 'offset': offset}).encode('utf-8')
+  return base64.urlsafe_b64encode(payload).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+  try:
+    payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    result_id, offset = str(payload['id']), int(payload['offset'])
+  except (ValueError, KeyError, TypeError, binascii.Error):
+    raise HTTPException(status_code=400, detail="Cursor inválido.")
+
+  if offset < 0:
+    raise HTTPException(status_code=400, detail="Cursor inválido.")
+  return result_id, offset
+
+
+def _schedule_query(request: ScheduleGeneratorRequest, max_results: Optional[int]) -> ScheduleQuery:
+  return ScheduleQuery(
+    levels=request.levels,
+    career=request.career,
+    extra_subjects=request.extra_subjects,
+    required_subjects=request.required_subjects,
+    semesters=request.semesters,
+    start_time=request.start_time,
+    end_time=request.end_time,
+    excluded_teachers=request.excluded_teachers,
+    excluded_subjects=request.excluded_subjects,
+    min_course_availability=request.available_uses,
+    n=request.length,
+    credits=request.credits,
+    max_results=max_results,
+    time_budget_ms=request.time_budget_ms,
+    max_nodes=request.max_nodes,
+    engine=request.engine.value
+  )
+
 @router.post(
   '/schedules/',
   summary='Generar horarios',
   response_description="Una lista ordenada de 20 horarios generados de mejor puntuados a peor puntuados."
 )
-async def generate_schedules(request: ScheduleGeneratorRequest) -> List[Schedule]:
+async def generate_schedules(request: ScheduleGeneratorRequest, response: Response) -> List[Schedule]:
   '''
   A partir de los parametros dados genera una coleccion de horarios que cumplan con ellos.
   
@@ -42,32 +156,268 @@ async def generate_schedules(request: ScheduleGeneratorRequest) -> List[Schedule
   - **excluded_subjects**: nombres de asignaturas que seran excluidas de los horarios generados.
   - **required_subjects**: asignaturas que tienen que aparecer en los horarios obligatoriamente.
   - **extra_subjects**: asignaturas opcionales que amplian el conjunto de asignaturas posibles en un horario.
+  - **time_budget_ms**: tiempo maximo de busqueda; al agotarse se regresan los mejores horarios encontrados.
+  - **max_nodes**: numero maximo de nodos del arbol de busqueda que se exploraran.
+  - **engine**: motor de busqueda (`auto`, `backtracking`, `cp_sat` o `beam`,
+    aproximado); si el motor no esta disponible en el servidor se responde 501.
+  
+  - **session_id**: identificador de la sesion del cliente; si la peticion solo restringe los filtros
+    de la anterior de la misma sesion (excluir profesores, subir **available_uses**, acortar el rango
+    de horas o bajar **credits**), se reutiliza su resultado en lugar de buscar desde cero. La
+    busqueda de la sesion se registra aunque la peticion se sirva desde cache.
+  - **cursor**: cursor de la cabecera **X-Next-Cursor** de una respuesta anterior para obtener la
+    siguiente pagina de horarios.
+  
+  Los resultados se guardan en cache por 10 minutos o hasta que cambien los cursos almacenados;
+  peticiones identicas simultaneas comparten una sola busqueda. La primera pagina solo ordena los
+  horarios de esa pagina; si un cursor pide horarios que aun no se han ordenado, la busqueda se
+  repite con al menos el doble de horarios y se reemplaza en cache, asi que la paginacion no tiene
+  limite.
+  
+  Antes de buscar se estima el numero de horarios posibles: con `auto`, las busquedas muy grandes
+  usan la busqueda aproximada (`beam`, con **X-Search-Exhaustive** en `false`) y las que no podrian
+  terminar a tiempo se rechazan con 422 y una sugerencia para acotar la peticion.
+  
+  Las busquedas se ejecutan en un pool acotado; **X-Solver-Queue-Wait-Ms** indica cuanto espero
+  la peticion su turno y, si la cola esta llena, se responde 503.
+  
+  La cabecera **X-Search-Exhaustive** indica si la busqueda fue exhaustiva (`true`) o se corto
+  por el presupuesto (`false`), y **X-Search-Explored-Nodes** cuantos nodos se exploraron. Si hay
+  mas horarios disponibles, **X-Next-Cursor** contiene el cursor de la siguiente pagina.
   '''
   start = time.time()
+
+  request_key = _canonical_request_key(request)
+  request_id = hashlib.sha1(repr(request_key).encode('utf-8')).hexdigest()
+
+  offset = 0
+  if request.cursor:
+    cursor_request_id, offset = _decode_cursor(request.cursor)
+    if cursor_request_id != request_id:
+      raise HTTPException(status_code=400, detail="El cursor no corresponde a esta petición.")
+
+  # Los resultados se invalidan cuando cambian los cursos almacenados
   course_service = CourseService(router.courses)
+  data_version = course_service.get_data_version()
+  schedule_results_cache.sync_data_version(data_version)
+  solver_sessions.sync_data_version(data_version)
 
-  schedule_service = ScheduleService(course_service)
+  # Se ordenan los horarios hasta la página solicitada y uno más para saber si hay otra página
+  depth = offset + PAGE_SIZE + 1
 
-  schedules = schedule_service.generate_schedules(
-      levels=request.levels,
-      career=request.career,
-      extra_subjects=request.extra_subjects,
-      required_subjects=request.required_subjects,
-      semesters=request.semesters,
-      start_time=request.start_time,
-      end_time=request.end_time,
-      excluded_teachers=request.excluded_teachers,
-      excluded_subjects=request.excluded_subjects,
-      min_course_availability=request.available_uses,
-      n = request.length,
-      credits=request.credits,
-      max_results = 20
-    )
+  async def search(max_results: int) -> SolverContext:
+    previous = solver_sessions.get(request.session_id) if request.session_id else None
+    return await _run_on_solver_pool(response, _search_ranked_schedules, request, previous, max_results)
+
+  # Las peticiones idénticas se sirven desde cache o esperan a la búsqueda en curso
+  cache_key = (request_key, schedule_results_cache.data_version)
+  context = await schedule_results_cache.get_or_compute(cache_key, lambda: search(depth))
+
+  # El ranking en cache se quedó corto para el cursor: se amplía al menos al doble
+  if len(context.ranked) == context.max_results and context.max_results < depth:
+    context = await search(max(depth, 2 * context.max_results))
+    schedule_results_cache.put(cache_key, context)
+
+  # También con la búsqueda en cache o compartida, para que la sesión pueda refinarla
+  if request.session_id:
+    solver_sessions.put(request.session_id, context)
+  result = context.ranked
   
   end = time.time()
   print("Time Taken: {:.6f}s".format(end-start))
 
-  return schedules 
+  response.headers['X-Search-Exhaustive'] = 'true' if result.exhaustive else 'false'
+  response.headers['X-Search-Explored-Nodes'] = str(result.explored_nodes)
+  if offset + PAGE_SIZE < len(result):
+    response.headers['X-Next-Cursor'] = _encode_cursor(request_id, offset + PAGE_SIZE)
+
+  # Solo se construyen los horarios de la página solicitada
+  return result.page(offset, PAGE_SIZE)
+
+
+def _solver_busy_error() -> HTTPException:
+  return HTTPException(
+    status_code=503,
+    detail="El servidor está ocupado generando otros horarios. Intenta de nuevo en unos segundos.",
+    headers={'Retry-After': '5'}
+  )
+
+async def _run_on_solver_pool(response: Response, fn, *args):
+  """Ejecuta la búsqueda en el pool acotado, fuera del event loop, junto con las consultas a MongoDB"""
+  try:
+    solver_run = await solver_pool.run(fn, *args)
+  except SolverQueueFullError:
+    raise _solver_busy_error()
+  except SolverUnavailableError as e:
+    raise HTTPException(status_code=501, detail=str(e))
+  except SearchTooLargeError as e:
+    raise HTTPException(status_code=422, detail=str(e))
+  response.headers['X-Solver-Queue-Wait-Ms'] = '{:.1f}'.format(solver_run.wait_ms)
+  return solver_run.value
+
+def _search_ranked_schedules(
+  request: ScheduleGeneratorRequest,
+  previous: Optional[SolverContext],
+  max_results: int
+) -> SolverContext:
+  course_service = CourseService(router.courses)
+
+  schedule_service = ScheduleService(course_service, backends=solver_backends, universe_cache=compiled_universes)
+
+  return schedule_service.refine_schedules(previous, _schedule_query(request, max_results))
+
+@router.post(
+  '/schedules/count',
+  summary='Contar horarios posibles',
+  response_description="Número de horarios válidos que cumplen con los parametros dados.",
+  response_model=ScheduleCountResult
+)
+async def count_schedules(request: ScheduleGeneratorRequest, response: Response) -> ScheduleCountResult:
+  '''
+  Cuenta cuantos horarios cumplen con los mismos parametros que **/schedules/**, sin generarlos.
+  
+  Si la busqueda se corta por **time_budget_ms** o **max_nodes**, **exhaustive** es `false` y
+  **count** es una cota inferior del numero de horarios posibles.
+  '''
+  return await _run_on_solver_pool(response, _count_schedules, request)
+
+
+def _count_schedules(request: ScheduleGeneratorRequest) -> ScheduleCountResult:
+  course_service = CourseService(router.courses)
+
+  schedule_service = ScheduleService(course_service, universe_cache=compiled_universes)
+
+  return schedule_service.count_schedules(_schedule_query(request, None))
+
+@router.post(
+  '/schedules/batch',
+  summary='Generar horarios para varias peticiones',
+  response_description="Los 20 mejores horarios de cada petición, en el mismo orden que las peticiones.",
+  response_model=List[ScheduleBatchResult]
+)
+async def generate_schedules_batch(request: ScheduleBatchRequest, response: Response) -> List[ScheduleBatchResult]:
+  '''
+  Genera horarios para varias peticiones con los mismos parametros que **/schedules/** (hasta 50).
+  
+  Las peticiones que comparten carrera, niveles, semestres y asignaturas requeridas y extra
+  consultan sus cursos una sola vez, las que ademas comparten filtros comparten la compilacion
+  de sus cursos, y las busquedas se resuelven en paralelo.
+  
+  Cada resultado indica si su busqueda fue exhaustiva (**exhaustive**) y cuantos nodos exploro;
+  no hay paginacion, **session_id** y **cursor** se ignoran. El **time_budget_ms** de cada
+  peticion corre desde el inicio del lote, asi que el lote termina en el mayor de ellos.
+  
+  Una peticion que no se puede resolver no hace fallar al lote: su resultado trae el codigo que
+  habria regresado sola (**status_code**, 422 o 501) y el motivo (**error**).
+  '''
+  ranked_results = await _run_on_solver_pool(response, _search_batch, request.requests)
+
+  return [_batch_result(ranked) for ranked in ranked_results]
+
+
+def _batch_result(ranked: Union[RankedSchedules, Exception]) -> ScheduleBatchResult:
+  if isinstance(ranked, SolverUnavailableError):
+    return ScheduleBatchResult(status_code=501, error=str(ranked))
+  if isinstance(ranked, Exception):
+    return ScheduleBatchResult(status_code=422, error=str(ranked))
+  return ScheduleBatchResult(
+    schedules=ranked.page(0, PAGE_SIZE),
+    exhaustive=ranked.exhaustive,
+    explored_nodes=ranked.explored_nodes
+  )
+
+
+def _search_batch(requests: List[ScheduleGeneratorRequest]) -> List[Union[RankedSchedules, Exception]]:
+  course_service = CourseService(router.courses)
+
+  schedule_service = ScheduleService(course_service, backends=solver_backends, universe_cache=compiled_universes)
+
+  return schedule_service.rank_schedules_batch([_schedule_query(request, PAGE_SIZE) for request in requests])
+
+@router.get(
+  '/schedules/solver-stats',
+  summary='Estado del pool de generación de horarios',
+  response_model=SolverPoolStats
+)
+async def solver_stats() -> SolverPoolStats:
+  '''
+  Regresa la ocupacion del pool que ejecuta las busquedas de **/schedules/**: busquedas en curso,
+  peticiones en cola, rechazos por cola llena y tiempos de espera.
+  '''
+  return SolverPoolStats(**solver_pool.stats())
+
+@router.post(
+  '/schedules/stream',
+  summary='Generar horarios en streaming',
+  response_description="Horarios en formato NDJSON (un horario por línea) en el orden en que se encuentran."
+)
+async def stream_schedules(request: ScheduleGeneratorRequest) -> StreamingResponse:
+  '''
+  Genera horarios con los mismos parametros que **/schedules/** pero los envia conforme se
+  encuentran, un objeto JSON por linea (`application/x-ndjson`), sin ordenarlos por puntuacion.
+  
+  La busqueda termina al recorrer todo el espacio de busqueda, al agotar **time_budget_ms** o
+  **max_nodes**, o al enviar 1000 horarios. Se ejecuta en el mismo pool acotado que
+  **/schedules/**: con la cola llena responde 503, y las busquedas demasiado grandes se
+  rechazan con 422 antes de enviar el primer horario.
+  '''
+  loop = asyncio.get_running_loop()
+  lines: 'asyncio.Queue[Optional[str]]' = asyncio.Queue()
+  # Se activa si el cliente se desconecta, para no seguir buscando
+  stop = threading.Event()
+
+  def emit(line: Optional[str]) -> None:
+    loop.call_soon_threadsafe(lines.put_nowait, line)
+
+  try:
+    solver_run = solver_pool.submit(_stream_schedules, request, emit, stop)
+  except SolverQueueFullError:
+    raise _solver_busy_error()
+
+  # La respuesta empieza con el primer horario; si no hay ninguno, la búsqueda
+  # terminó o se rechazó antes de empezar y su error aún puede responderse
+  try:
+    first_line = await lines.get()
+  except asyncio.CancelledError:
+    stop.set()
+    raise
+  if first_line is None:
+    try:
+      await asyncio.wrap_future(solver_run)
+    except SearchTooLargeError as e:
+      raise HTTPException(status_code=422, detail=str(e))
+
+  async def ndjson():
+    line = first_line
+    try:
+      while line is not None:
+        yield line
+        line = await lines.get()
+      # Propaga los errores de la búsqueda
+      await asyncio.wrap_future(solver_run)
+    finally:
+      stop.set()
+
+  return StreamingResponse(ndjson(), media_type='application/x-ndjson')
+
+
+def _stream_schedules(
+  request: ScheduleGeneratorRequest,
+  emit: Callable[[Optional[str]], None],
+  stop: threading.Event
+) -> None:
+  """Envía con ``emit`` cada horario encontrado como una línea NDJSON y al final ``None``"""
+  course_service = CourseService(router.courses)
+
+  schedule_service = ScheduleService(course_service, universe_cache=compiled_universes)
+
+  try:
+    for schedule in schedule_service.iter_schedules(_schedule_query(request, STREAM_MAX_RESULTS)):
+      if stop.is_set():
+        break
+      emit(schedule.json() + '\n')
+  finally:
+    emit(None)
 
 @router.post(
   '/schedules/download',
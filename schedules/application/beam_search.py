@@ -0,0 +1,146 @@
+import heapq
+import os
+from typing import Iterator, List, Optional, Tuple
+
+from schedules.application.search_budget import SearchBudget
+from schedules.application.schedule_search import CREDITS_TOLERANCE, ScheduleLeaf, ScheduleSearchProblem
+
+# Horarios parciales que se conservan en cada nivel de la búsqueda en haz
+BEAM_WIDTH = int(os.environ.get('SCHEDULE_BEAM_WIDTH', 2000))
+
+# Horarios parciales del último nivel completo del haz que se completan de
+# forma voraz si el presupuesto se agota a la mitad de un nivel
+GREEDY_COMPLETIONS = 100
+
+# Horario parcial: cursos elegidos, cursos bloqueados, puntaje y créditos
+PartialState = Tuple[Tuple[int, ...], int, float, float]
+
+
+def beam_search_schedules(
+    problem: ScheduleSearchProblem,
+    budget: SearchBudget,
+    beam_width: int = BEAM_WIDTH
+) -> Iterator[ScheduleLeaf]:
+    """Genera horarios válidos con una búsqueda en haz, aproximada pero de costo acotado
+
+    Decide las asignaturas en orden (las requeridas primero) y, tras cada
+    una, conserva solo los ``beam_width`` horarios parciales con mejor cota
+    optimista: su puntaje más el de las mejores asignaturas restantes. El
+    trabajo es proporcional a ``beam_width`` por el número de secciones, sin
+    importar el tamaño del espacio de búsqueda; si el haz descartó algún
+    horario parcial, ``budget`` se marca como truncado porque los horarios
+    encontrados podrían no ser los mejores. Si el presupuesto se agota a la
+    mitad de un nivel, los mejores horarios parciales del nivel anterior se
+    completan de forma voraz (ver ``_complete_greedily``).
+    """
+    if not problem.feasible:
+        return
+
+    conflicts = problem.conflicts
+    scores = problem.compiled.scores
+    course_credits = problem.compiled.credits
+    subject_sections = problem.subject_sections
+    subject_count = len(subject_sections)
+    n = problem.n
+    credits = problem.credits
+
+    # Horarios parciales con su cota optimista
+    beam: List[Tuple[float, PartialState]] = [(problem.optimistic_score((1 << subject_count) - 1, n), ((), 0, 0.0, 0.0))]
+    pruned = False
+    for s in range(subject_count):
+        # Asignaturas que quedan por decidir después de esta
+        remaining = ((1 << subject_count) - 1) & ~((1 << (s + 1)) - 1)
+        undecided = subject_count - s - 1
+
+        expanded: List[Tuple[float, int, PartialState]] = []
+        for _, (schedule, blocked, positive_score, credits_required) in beam:
+            options: List[PartialState] = []
+            if len(schedule) < n:
+                for i in subject_sections[s]:
+                    if not budget.spend():
+                        for _, state in heapq.nlargest(GREEDY_COMPLETIONS, beam):
+                            leaf = _complete_greedily(problem, state, s)
+                            if leaf is not None:
+                                yield leaf
+                        return
+                    if (blocked >> i) & 1:
+                        continue
+                    next_credits = credits_required + course_credits[i]
+                    if next_credits > credits + CREDITS_TOLERANCE:
+                        continue
+                    options.append((schedule + (i,), blocked | conflicts[i], positive_score + scores[i], next_credits))
+
+            # Las asignaturas requeridas no se pueden omitir
+            if s >= problem.required_count:
+                options.append((schedule, blocked, positive_score, credits_required))
+
+            for option in options:
+                missing = n - len(option[0])
+                # Ya no alcanzan las asignaturas restantes para completar el horario
+                if missing > undecided:
+                    continue
+                bound = option[2] + problem.optimistic_score(remaining, missing)
+                expanded.append((bound, -len(expanded), option))
+
+        if len(expanded) > beam_width:
+            pruned = True
+            expanded = heapq.nlargest(beam_width, expanded)
+        beam = [(bound, option) for bound, _, option in expanded]
+
+    # Los horarios descartados por el haz no se exploraron
+    budget.truncated = budget.truncated or pruned
+    for _, (schedule, _, positive_score, credits_required) in beam:
+        if credits_required <= credits:
+            yield ScheduleLeaf(schedule, positive_score, credits_required)
+
+
+def _complete_greedily(problem: ScheduleSearchProblem, state: PartialState, s: int) -> Optional[ScheduleLeaf]:
+    """Completa un horario parcial decidido hasta antes de la asignatura ``s``, sin buscar
+
+    Elige para cada asignatura requerida pendiente su mejor sección
+    compatible y después agrega las secciones compatibles de mejor puntaje
+    entre las asignaturas opcionales restantes hasta tener ``n`` cursos.
+    Regresa ``None`` si así no se completa el horario.
+    """
+    schedule, blocked, positive_score, credits_required = state
+    schedule = list(schedule)
+    scores = problem.compiled.scores
+    course_credits = problem.compiled.credits
+
+    def fits(i: int) -> bool:
+        return not (blocked >> i) & 1 and credits_required + course_credits[i] <= problem.credits + CREDITS_TOLERANCE
+
+    pending_required = [problem.subject_sections[t] for t in range(s, problem.required_count)]
+    optional = sorted(
+        (
+            (scores[i], t, i)
+            for t in range(max(s, problem.required_count), len(problem.subject_sections))
+            for i in problem.subject_sections[t]
+        ),
+        reverse=True
+    )
+
+    chosen_subjects = set()
+    for sections in pending_required:
+        best = max((i for i in sections if fits(i)), key=lambda i: scores[i], default=None)
+        if best is None:
+            return None
+        schedule.append(best)
+        blocked |= problem.conflicts[best]
+        positive_score += scores[best]
+        credits_required += course_credits[best]
+
+    for _, t, i in optional:
+        if len(schedule) >= problem.n:
+            break
+        if t in chosen_subjects or not fits(i):
+            continue
+        chosen_subjects.add(t)
+        schedule.append(i)
+        blocked |= problem.conflicts[i]
+        positive_score += scores[i]
+        credits_required += course_credits[i]
+
+    if len(schedule) < problem.n or credits_required > problem.credits:
+        return None
+    return ScheduleLeaf(tuple(schedule), positive_score, credits_required)
@@ -0,0 +1,28 @@
+from array import array
+from typing import Dict, List
+
+from courses.domain.model.course import Course
+from schedules.application.time_slots import TimeSlotEncoder
+
+
+class CompiledCourses:
+    """Cursos de una búsqueda compilados en arreglos paralelos indexados por curso
+
+    La búsqueda solo trabaja con índices enteros y lee de estos arreglos los
+    datos que necesita en cada nodo, sin acceder a los atributos de los
+    modelos ``Course``; los cursos originales solo se consultan al construir
+    los horarios que se regresan.
+    """
+
+    __slots__ = ('subject_ids', 'masks', 'scores', 'credits')
+
+    def __init__(self, courses: List[Course], subject_ids: Dict[str, int]):
+        # Posición de la asignatura de cada curso (ver CompiledUniverse.subjects)
+        self.subject_ids = array('i', (subject_ids[course.subject] for course in courses))
+        # Las máscaras de franjas pueden exceder 64 bits, así que se guardan como enteros de Python
+        self.masks: List[int] = TimeSlotEncoder(courses).encode_all(courses)
+        self.scores = array('d', (course.teacher_positive_score for course in courses))
+        self.credits = array('d', (course.required_credits for course in courses))
+
+    def __len__(self) -> int:
+        return len(self.subject_ids)
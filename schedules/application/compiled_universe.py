@@ -0,0 +1,62 @@
+from typing import Dict, List, Tuple
+
+from courses.domain.model.course import Course
+from schedules.application.compiled_courses import CompiledCourses
+from schedules.application.conflict_graph import build_conflict_bitsets
+
+
+class CompiledUniverse:
+    """Universo de cursos de una petición compilado una sola vez para todas sus búsquedas
+
+    El universo son los cursos que regresa el repositorio para una carrera,
+    niveles, semestres y asignaturas requeridas y extra, antes de aplicar los
+    filtros de la petición. Se colapsan las secciones intercambiables en
+    clases, se compilan sus representantes (ver ``CompiledCourses``) y se
+    precalculan sus conflictos por pares; cada búsqueda aplica después sus
+    filtros como un subconjunto de las clases (ver ``select``), sin volver a
+    compilar.
+    """
+
+    def __init__(self, courses: List[Course]):
+        self.courses = courses
+
+        # Misma asignatura, mismas sesiones, mismos créditos y mismo puntaje
+        # producen horarios idénticos para la búsqueda
+        classes: Dict[Tuple, int] = {}
+        representatives: List[Course] = []
+        # Clase de cada curso del universo, identificado por instancia
+        self.class_of: Dict[int, int] = {}
+        for course in courses:
+            sessions = tuple(sorted(
+                (session['day'], session['start_time'], session['end_time'])
+                for session in course.schedule
+            ))
+            key = (course.subject, sessions, course.required_credits, course.teacher_positive_score)
+            if key not in classes:
+                classes[key] = len(representatives)
+                representatives.append(course)
+            self.class_of[id(course)] = classes[key]
+
+        self.subjects: List[str] = list(dict.fromkeys(course.subject for course in representatives))
+        self.compiled = CompiledCourses(
+            representatives,
+            {subject: position for position, subject in enumerate(self.subjects)}
+        )
+        self.conflicts = build_conflict_bitsets(self.compiled.subject_ids, self.compiled.masks)
+
+    def __len__(self) -> int:
+        return len(self.compiled)
+
+    def contains(self, courses: List[Course]) -> bool:
+        """Indica si todos los cursos dados son instancias de este universo"""
+        return all(id(course) in self.class_of for course in courses)
+
+    def select(self, courses: List[Course]) -> List[List[Course]]:
+        """Secciones de cada clase que están entre ``courses``, que deben provenir del universo
+
+        Las clases sin secciones entre ``courses`` quedan vacías.
+        """
+        members: List[List[Course]] = [[] for _ in range(len(self))]
+        for course in courses:
+            members[self.class_of[id(course)]].append(course)
+        return members
@@ -0,0 +1,32 @@
+from typing import Dict, Hashable, List, Sequence
+
+
+def popcount(bits: int) -> int:
+    """Número de bits encendidos de ``bits`` (``int.bit_count`` solo existe desde Python 3.10)"""
+    return bin(bits).count('1')
+
+
+def build_conflict_bitsets(subjects: Sequence[Hashable], masks: List[int]) -> List[int]:
+    """Precalcula, para cada curso, el conjunto de cursos con los que no puede coexistir
+
+    Dos cursos no pueden coexistir en un horario si se traslapan en alguna franja
+    o si son secciones de la misma asignatura. El resultado es una lista paralela
+    a los cursos donde el bit ``j`` del elemento ``i`` indica que los cursos ``i``
+    y ``j`` están en conflicto (cada curso está en conflicto consigo mismo).
+
+    Args:
+        subjects: Asignatura (nombre o identificador) de cada curso
+        masks: Máscara de franjas ocupadas de cada curso (ver TimeSlotEncoder)
+    """
+    subject_bitsets: Dict[Hashable, int] = {}
+    for index, subject in enumerate(subjects):
+        subject_bitsets[subject] = subject_bitsets.get(subject, 0) | (1 << index)
+
+    conflicts = [subject_bitsets[subject] for subject in subjects]
+    for i in range(len(masks)):
+        for j in range(i + 1, len(masks)):
+            if masks[i] & masks[j]:
+                conflicts[i] |= 1 << j
+                conflicts[j] |= 1 << i
+
+    return conflicts
@@ -0,0 +1,175 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Union
+
+from schedules.application.top_schedules import TopSchedules
+from schedules.application.search_budget import SearchBudget
+from schedules.application.schedule_search import ScheduleSearchProblem, SearchNode, backtrack_schedules
+from schedules.domain.ports.solver_backend import SolverBackend, SolverUnavailableError
+
+# Tamaño estimado del árbol (ver ScheduleSearchProblem.estimated_size) a partir
+# del cual la búsqueda se reparte entre procesos; por debajo, el costo de
+# serializar el problema y coordinar los procesos no compensa
+PARALLEL_SEARCH_THRESHOLD = int(os.environ.get('SCHEDULE_PARALLEL_THRESHOLD', 5_000_000))
+PARALLEL_SEARCH_WORKERS = int(os.environ.get('SCHEDULE_PARALLEL_WORKERS', os.cpu_count() or 1))
+
+# Subárboles por proceso, para repartir mejor la carga entre subárboles desiguales
+SUBTREES_PER_WORKER = 4
+
+# Nodos de la búsqueda secuencial previa al reparto: la mayoría de las búsquedas
+# grandes según el tamaño estimado terminan aquí gracias a la poda, y las demás
+# reparten sus subárboles con la cota de los candidatos que encontró
+PARALLEL_SEARCH_PROBE_NODES = int(os.environ.get('SCHEDULE_PARALLEL_PROBE_NODES', 100_000))
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+# Candidato serializable entre procesos: puntaje, cursos, créditos y horarios equivalentes
+CandidateTuple = Tuple[float, Tuple[int, ...], float, int]
+
+SubtreeResult = Tuple[List[CandidateTuple], bool, int]
+
+# Problema completo a resolver: motor, problema, máximo de resultados, límite
+# absoluto de tiempo (``time.time()``) y nodos
+SolveJob = Tuple[SolverBackend, ScheduleSearchProblem, int, Optional[float], Optional[int]]
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # El servidor usa hilos (pool de búsquedas, event loop): hacer fork de un
+        # proceso con hilos puede heredar locks tomados, así que los procesos se
+        # crean desde un servidor limpio cuando la plataforma lo permite
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        _executor = ProcessPoolExecutor(
+            max_workers=PARALLEL_SEARCH_WORKERS,
+            mp_context=multiprocessing.get_context(start_method)
+        )
+    return _executor
+
+
+def _candidate_tuples(best_schedules: TopSchedules) -> List[CandidateTuple]:
+    """Candidatos de ``best_schedules`` que no fueron sembrados, del mejor al peor"""
+    return [
+        (candidate.score, candidate.course_indices, candidate.credits, candidate.count)
+        for candidate in best_schedules.ranked()
+        if tuple(sorted(candidate.course_indices)) not in best_schedules.seeded
+    ]
+
+
+def _search_subtree(
+    problem: ScheduleSearchProblem,
+    start: SearchNode,
+    max_results: int,
+    seeds: List[CandidateTuple],
+    wall_deadline: Optional[float],
+    max_nodes: Optional[int]
+) -> SubtreeResult:
+    """Busca los mejores horarios de un subárbol (se ejecuta en un proceso del pool)
+
+    ``seeds`` son los candidatos que ya se conocen, que dan la cota inicial de
+    la poda y no se regresan de nuevo. ``wall_deadline`` es el límite absoluto
+    de toda la búsqueda, no un tiempo relativo: un subárbol que espera en la
+    cola del pool no recibe más tiempo.
+    """
+    budget = SearchBudget(max_nodes=max_nodes, wall_deadline=wall_deadline)
+    best_schedules = TopSchedules(max_results)
+    for seed in seeds:
+        best_schedules.seed(*seed)
+    for leaf in backtrack_schedules(problem, budget, best_schedules, start):
+        best_schedules.push(leaf.score, leaf.course_indices, leaf.credits, problem.multiplicity(leaf.course_indices))
+
+    return _candidate_tuples(best_schedules), budget.truncated, budget.explored_nodes
+
+
+def _solve_problem(
+    backend: SolverBackend,
+    problem: ScheduleSearchProblem,
+    max_results: int,
+    wall_deadline: Optional[float],
+    max_nodes: Optional[int]
+) -> Union[SubtreeResult, SolverUnavailableError]:
+    """Busca los mejores horarios de un problema completo con el motor dado
+
+    Si el motor no está disponible regresa el error en lugar de lanzarlo, para
+    no interrumpir los demás problemas de ``solve_problems``.
+    """
+    budget = SearchBudget(max_nodes=max_nodes, wall_deadline=wall_deadline)
+    best_schedules = TopSchedules(max_results)
+    try:
+        backend.solve(problem, budget, best_schedules)
+    except SolverUnavailableError as e:
+        return e
+
+    return _candidate_tuples(best_schedules), budget.truncated, budget.explored_nodes
+
+
+def solve_problems(jobs: List[SolveJob]) -> List[Union[SubtreeResult, SolverUnavailableError]]:
+    """Resuelve varios problemas independientes, repartidos entre el pool de procesos
+
+    Los motores no deben repartir a su vez su búsqueda entre procesos. Con un
+    solo problema (o un solo proceso) se resuelven en el proceso actual. Los
+    problemas cuyo motor no está disponible regresan su error.
+    """
+    if len(jobs) <= 1 or PARALLEL_SEARCH_WORKERS <= 1:
+        return [_solve_problem(*job) for job in jobs]
+
+    executor = _get_executor()
+    futures = [executor.submit(_solve_problem, *job) for job in jobs]
+    return [future.result() for future in futures]
+
+
+def parallel_search(
+    problem: ScheduleSearchProblem,
+    budget: SearchBudget,
+    best_schedules: TopSchedules
+) -> None:
+    """Reparte la búsqueda de los mejores horarios entre un pool de procesos
+
+    Primero se busca secuencialmente hasta ``PARALLEL_SEARCH_PROBE_NODES``
+    nodos: si la poda basta para terminar, no se reparte nada. Si no, el árbol
+    se divide a partir de sus opciones del primer nivel y cada subárbol parte
+    de los candidatos ya encontrados (su cota de poda); al final sus nuevos
+    candidatos se combinan en ``best_schedules``. Todos los subárboles se
+    detienen en el límite de tiempo de ``budget``, sin importar cuándo
+    empiecen, y su límite de nodos se reparte entre ellos.
+    """
+    wall_deadline = budget.wall_deadline()
+
+    probe_nodes = PARALLEL_SEARCH_PROBE_NODES
+    if budget.max_nodes is not None:
+        probe_nodes = min(probe_nodes, budget.max_nodes - budget.explored_nodes)
+    probe = SearchBudget(max_nodes=probe_nodes, wall_deadline=wall_deadline)
+    for leaf in backtrack_schedules(problem, probe, best_schedules):
+        best_schedules.push(leaf.score, leaf.course_indices, leaf.credits, problem.multiplicity(leaf.course_indices))
+    budget.explored_nodes += probe.explored_nodes
+    if not probe.truncated:
+        return
+    if probe.explored_nodes < PARALLEL_SEARCH_PROBE_NODES:
+        # Se agotó el presupuesto de la búsqueda, no el de la búsqueda previa
+        budget.truncated = True
+        return
+
+    subtrees = problem.split(PARALLEL_SEARCH_WORKERS * SUBTREES_PER_WORKER)
+    seeds = [
+        (candidate.score, candidate.course_indices, candidate.credits, candidate.count)
+        for candidate in best_schedules.ranked()
+    ]
+
+    max_nodes: Optional[int] = None
+    if budget.max_nodes is not None:
+        max_nodes = max((budget.max_nodes - budget.explored_nodes) // len(subtrees), 1)
+
+    executor = _get_executor()
+    futures = [
+        executor.submit(_search_subtree, problem, start, best_schedules.capacity, seeds, wall_deadline, max_nodes)
+        for start in subtrees
+    ]
+
+    # Se combinan en el orden de los subárboles para conservar el desempate por orden de hallazgo
+    for future in futures:
+        candidates, truncated, explored_nodes = future.result()
+        for score, course_indices, credits, count in candidates:
+            best_schedules.push(score, course_indices, credits, count)
+        budget.explored_nodes += explored_nodes
+        budget.truncated = budget.truncated or truncated
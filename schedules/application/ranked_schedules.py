@@ -0,0 +1,71 @@
+import itertools
+from statistics import mean
+from typing import Iterator, List, Tuple
+
+from courses.domain.model.course import Course
+from schedules.domain.model.schedule import Schedule
+from schedules.application.top_schedules import ScheduleCandidate
+
+
+def build_schedule(schedule_courses: List[Course], credits_required: float, option: int) -> Schedule:
+    """Construye el modelo de un horario a partir de cursos ya validados
+
+    Los ``Course`` provienen del repositorio y ya están validados, así que se
+    omite la validación (y la copia) de pydantic al construir el horario.
+    """
+    return Schedule.construct(
+        option=option,
+        avg_positive_score=mean(course.teacher_positive_score for course in schedule_courses),
+        courses=schedule_courses,
+        total_credits_required=credits_required
+    )
+
+
+class RankedSchedules:
+    """Mejores horarios de una búsqueda guardados como índices de cursos
+
+    Conserva los candidatos ordenados tal como los deja la búsqueda (índices
+    de representantes, créditos y multiplicidad) junto con las clases de
+    secciones equivalentes, y solo construye los ``Schedule`` de las páginas
+    que se solicitan.
+    """
+
+    def __init__(
+        self,
+        course_classes: List[List[Course]],
+        candidates: List[ScheduleCandidate],
+        max_results: int,
+        exhaustive: bool,
+        explored_nodes: int
+    ):
+        self.course_classes = course_classes
+        self.candidates = candidates
+        self.max_results = max_results
+        self.size = min(max_results, sum(candidate.count for candidate in candidates))
+        self.exhaustive = exhaustive
+        self.explored_nodes = explored_nodes
+
+    def __len__(self) -> int:
+        return self.size
+
+    def concrete_schedules(self) -> Iterator[Tuple[List[Course], float]]:
+        """Cursos y créditos de los horarios del ranking, en orden, sin construir los ``Schedule``"""
+        # Expandir las clases de secciones equivalentes en horarios concretos
+        expanded = (
+            (list(schedule_courses), candidate.credits)
+            for candidate in self.candidates
+            for schedule_courses in itertools.product(*(self.course_classes[i] for i in candidate.course_indices))
+        )
+        return itertools.islice(expanded, self.size)
+
+    def page(self, offset: int, limit: int) -> List[Schedule]:
+        """Construye los horarios en las posiciones ``[offset, offset + limit)`` del ranking"""
+        stop = min(offset + limit, self.size)
+        if offset >= stop:
+            return []
+
+        schedules = itertools.islice(self.concrete_schedules(), offset, stop)
+        return [
+            build_schedule(schedule_courses, credits_required, option=offset + position)
+            for position, (schedule_courses, credits_required) in enumerate(schedules)
+        ]
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class ScheduleResultCache:
+    """Cache en memoria (LRU con TTL) de resultados de generación de horarios
+
+    Las entradas se identifican por una llave canónica de la petición y la
+    versión de los datos de cursos; al cambiar la versión se descartan todas.
+    Las peticiones idénticas concurrentes se agrupan para que solo una ejecute
+    la búsqueda y las demás esperen su resultado. ``sync_data_version``,
+    ``get`` y ``put`` se pueden llamar desde varios hilos (p. ej. el pool de
+    búsquedas).
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self.in_flight: Dict[Hashable, 'asyncio.Future[Any]'] = {}
+        self.data_version: Optional[Hashable] = None
+        self.lock = threading.Lock()
+
+    def sync_data_version(self, data_version: Hashable) -> None:
+        """Invalida todas las entradas si los datos de cursos cambiaron"""
+        with self.lock:
+            if data_version != self.data_version:
+                self.entries.clear()
+                self.data_version = data_version
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            created_at, value = entry
+            if time.monotonic() - created_at > self.ttl_seconds:
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Regresa el valor en cache o lo calcula una sola vez para todas las peticiones en curso"""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self.in_flight[key] = task
+
+            def finish(done: 'asyncio.Future[Any]') -> None:
+                self.in_flight.pop(key, None)
+                if not done.cancelled() and done.exception() is None:
+                    self.put(key, done.result())
+
+            task.add_done_callback(finish)
+
+        # shield: si la petición que espera se cancela, las demás siguen esperando el mismo cálculo
+        return await asyncio.shield(task)
@@ -1,117 +1,384 @@
-from statistics import mean
-from typing import List, Tuple, Optional
+import itertools
+import sys
+import time
+from typing import Dict, Hashable, Iterator, List, Tuple, Optional, Union
 
 from courses.domain.model.course import Course
 from courses.application.course import CourseService
-from schedules.domain.model.schedule import Schedule
+from schedules.domain.model.schedule import Schedule, ScheduleSearchResult, ScheduleCountResult
+from schedules.application.top_schedules import TopSchedules
+from schedules.application.ranked_schedules import RankedSchedules, build_schedule
+from schedules.application.solver_context import SolverContext
+from schedules.application.schedule_query import ScheduleQuery
+from schedules.application.compiled_universe import CompiledUniverse
+from schedules.application.result_cache import ScheduleResultCache
+from schedules.application.search_budget import SearchBudget
+from schedules.application.schedule_search import ScheduleSearchProblem, backtrack_schedules, count_schedules
+from schedules.application.parallel_search import PARALLEL_SEARCH_THRESHOLD, SolveJob, solve_problems
+from schedules.application.solver_backends import (
+    AUTO_ENGINE,
+    CP_SAT_THRESHOLD,
+    APPROXIMATE_THRESHOLD,
+    REJECT_THRESHOLD,
+    BacktrackingBackend,
+    BeamSearchBackend
+)
+from schedules.domain.ports.solver_backend import SolverBackend, SearchTooLargeError
 
 class ScheduleService:
     def __init__(
         self,
-        course_service: CourseService
+        course_service: CourseService,
+        parallel_threshold: int = PARALLEL_SEARCH_THRESHOLD,
+        backends: Optional[List[SolverBackend]] = None,
+        cp_sat_threshold: int = CP_SAT_THRESHOLD,
+        universe_cache: Optional[ScheduleResultCache] = None,
+        approximate_threshold: float = APPROXIMATE_THRESHOLD,
+        reject_threshold: float = REJECT_THRESHOLD
       ):
         self.course_service = course_service
+        # Universos de cursos ya compilados, compartidos entre peticiones (ver CompiledUniverse)
+        self.universe_cache = universe_cache
+        # Tamaño estimado de búsqueda a partir del cual se prefiere CP-SAT, si está registrado
+        self.cp_sat_threshold = cp_sat_threshold
+        # Horarios estimados a partir de los cuales se usa la búsqueda aproximada o se rechaza la petición
+        self.approximate_threshold = approximate_threshold
+        self.reject_threshold = reject_threshold
 
-    def generate_schedules(
-        self,
-        levels: List[str],
-        career: str,
-        extra_subjects: List[Tuple[str, str]],
-        required_subjects: List[Tuple[str, str]],
-        semesters: List[str],
-        start_time: Optional[str],
-        end_time: Optional[str],
-        excluded_teachers: List[str],
-        excluded_subjects: List[str],
-        min_course_availability: int,
-        n: int,
-        credits: float,
-        max_results: int = 20
-    ) -> List[Schedule]:
-        def backtrack(schedule: List[Course], start_index: int):
-            # Verificar si se ha alcanzado el tamaño objetivo del horario
-            if len(schedule) == n:
-                schedule_subjects = [course.subject for course in schedule]
-
-                if all(required_subject in schedule_subjects for required_subject in required_name_subjects):
-                    # Calcular la polaridad promedio de los profesores en el horario
-                    teachers_positive_score: List[float] = []
-                    credits_required: float = 0
-                    for course in schedule:
-                        teachers_positive_score.append(
-                            course.teacher_positive_score)
-                        credits_required = credits_required + course.required_credits
-                    
-                    if credits_required <= credits:
-                      schedule_result = Schedule(
-                          avg_positive_score=mean(teachers_positive_score),
-                          courses=schedule,
-                          total_credits_required=credits_required
-                      )
-                      schedules.append(schedule_result)
-                    return
-                else:
-                    return
-
-            # Iterar sobre los cursos regulares, comenzando desde el índice de inicio
-            for i in range(start_index, len(courses)):
-                if is_valid(schedule, courses[i]):
-                    schedule.append(courses[i])
-                    backtrack(schedule, i + 1)
-                    schedule.pop()
-
-        # Verificar si un curso es válido para agregar al horario actual
-        def is_valid(schedule: List[Course], course: Course) -> bool:
-            for existing_course in schedule:
-                if has_overlap(existing_course, course) or existing_course.subject == course.subject:
-                    return False
-            return True
-
-        # Verificar si dos cursos tienen superposición en su horario
-        def has_overlap(course1: Course, course2: Course) -> bool:
-            for session1 in course1.schedule:
-                for session2 in course2.schedule:
-                    if session1['day'] == session2['day']:
-                        session1_start, session1_end = session1['start_time'], session1['end_time']
-                        session2_start, session2_end = session2['start_time'], session2['end_time']
-
-                        if not (session1_end <= session2_start or session1_start >= session2_end):
-                            return True
-            return False
-
-
-        courses = self._get_courses(
-          levels=levels,
-          career=career,
-          extra_subjects=extra_subjects,
-          required_subjects=required_subjects,
-          semesters=semesters,
+        # Motores de búsqueda por nombre; los adaptadores externos (p. ej. CP-SAT) se inyectan
+        self.backends: Dict[str, SolverBackend] = {
+          backend.name: backend
+          for backend in [
+            BacktrackingBackend(parallel_threshold),
+            BeamSearchBackend()
+          ] + (backends or [])
+        }
+
+    def generate_schedules(self, query: ScheduleQuery) -> List[Schedule]:
+        return self.search_schedules(query).schedules
+
+    def search_schedules(self, query: ScheduleQuery) -> ScheduleSearchResult:
+        """Busca los mejores horarios dentro de un presupuesto opcional de tiempo y nodos
+
+        Si el presupuesto se agota, regresa los mejores horarios encontrados
+        hasta ese momento con ``exhaustive=False``.
+        """
+        ranked = self.rank_schedules(query)
+
+        return ScheduleSearchResult(
+          schedules=ranked.page(0, query.max_results),
+          exhaustive=ranked.exhaustive,
+          explored_nodes=ranked.explored_nodes
         )
-      
-        courses = self._filter_courses(
-          courses=courses,
-          start_time=start_time,
-          end_time=end_time,
-          excluded_teachers=excluded_teachers,
-          excluded_subjects=excluded_subjects,
-          min_course_availability=min_course_availability
+
+    def rank_schedules(self, query: ScheduleQuery) -> RankedSchedules:
+        """Igual que ``search_schedules``, pero sin construir los horarios
+
+        Los mejores horarios se regresan como índices de cursos y se
+        construyen por páginas con ``RankedSchedules.page``.
+        """
+        return self.refine_schedules(None, query).ranked
+
+    def refine_schedules(self, previous: Optional[SolverContext], query: ScheduleQuery) -> SolverContext:
+        """Igual que ``rank_schedules``, pero partiendo de la búsqueda anterior de una sesión
+
+        Si el universo de cursos no cambió, se reutilizan los cursos ya
+        obtenidos y compilados en lugar de consultarlos de nuevo. Si además la
+        petición solo restringe a la anterior (ver
+        ``SolverContext.is_tightened_by``), los horarios anteriores que siguen
+        siendo válidos se siembran como candidatos iniciales, de modo que la
+        búsqueda poda desde el inicio con su puntaje; y si la búsqueda anterior
+        ya los contenía a todos, ni siquiera se vuelve a buscar.
+
+        Regresa el contexto de esta búsqueda para refinarla en la siguiente.
+        """
+        # El presupuesto de tiempo incluye la obtención y compilación de los cursos
+        budget = SearchBudget(time_budget_ms=query.time_budget_ms, max_nodes=query.max_nodes)
+
+        universe = query.universe_key()
+        if previous is not None and previous.universe == universe:
+          compiled_universe = previous.compiled_universe
+        else:
+          previous = None
+          compiled_universe = self._compile_universe(query)
+
+        filtered_courses = self._filter_query_courses(compiled_universe, query)
+
+        required = query.required_subject_names()
+        problem = self._build_problem(query, compiled_universe, filtered_courses)
+
+        # Solo se conservan los mejores `max_results` candidatos como tuplas ligeras
+        best_schedules = TopSchedules(query.max_results)
+
+        search_needed = True
+        if previous is not None and previous.is_tightened_by(
+            filtered_courses, query.n, required, query.credits, query.max_results
+          ):
+          search_needed = not self._seed_surviving_schedules(previous, problem, filtered_courses, best_schedules)
+
+        if search_needed:
+          self._select_backend(problem, query.engine).solve(problem, budget, best_schedules)
+
+        ranked = RankedSchedules(
+          course_classes=problem.course_classes,
+          candidates=best_schedules.ranked(),
+          max_results=query.max_results,
+          exhaustive=not budget.truncated,
+          explored_nodes=budget.explored_nodes
         )
-        
-        required_name_subjects = [required_subject[1] for required_subject in required_subjects]
-        
 
-        schedules: List[Schedule] = []  # Lista para almacenar los horarios generados
-        # Iniciar la generación de horarios desde un horario vacío y el índice de inicio 0
-        backtrack([], 0)
-        
-        schedules = sorted(schedules, key=lambda x: x.avg_positive_score, reverse=True)
-        
-        r = [] 
-        for value, schedule in enumerate(schedules[:max_results]):
-          schedule.option = value
-          r.append(schedule)
-        return r
-      
+        return SolverContext(
+          universe=universe,
+          compiled_universe=compiled_universe,
+          filtered_courses=filtered_courses,
+          n=query.n,
+          required_subjects=required,
+          credits=query.credits,
+          max_results=query.max_results,
+          ranked=ranked
+        )
+
+    def rank_schedules_batch(self, queries: List[ScheduleQuery]) -> List[Union[RankedSchedules, Exception]]:
+        """Resuelve varias búsquedas compartiendo el trabajo común entre ellas
+
+        Las búsquedas se agrupan por universo de cursos (ver
+        ``ScheduleQuery.universe_key``): los cursos de cada grupo se obtienen y
+        compilan una sola vez, y las búsquedas del grupo con los mismos filtros
+        comparten el problema. Después las búsquedas se resuelven en paralelo
+        en el pool de procesos.
+
+        El tiempo de todas las búsquedas corre desde el inicio del lote, sin
+        importar cuánto esperen en el pool de procesos, así que el lote termina
+        en el mayor de sus ``time_budget_ms``. Una búsqueda que no se puede
+        resolver (``SearchTooLargeError``, ``SolverUnavailableError`` o un motor
+        desconocido) no detiene a las demás: en su lugar se regresa su error.
+        """
+        started = time.time()
+        universes: Dict[Hashable, CompiledUniverse] = {}
+        # Problema compilado por filtros, o el error si la búsqueda es demasiado grande
+        problems: Dict[Hashable, Union[ScheduleSearchProblem, SearchTooLargeError]] = {}
+        jobs: List[SolveJob] = []
+        # Búsquedas que no llegan a resolverse, por posición en el lote
+        errors: Dict[int, Exception] = {}
+
+        for position, query in enumerate(queries):
+          universe = query.universe_key()
+          if universe not in universes:
+            universes[universe] = self._compile_universe(query)
+
+          problem_key = query.problem_key()
+          if problem_key not in problems:
+            try:
+              problems[problem_key] = self._build_problem(query, universes[universe])
+            except SearchTooLargeError as e:
+              problems[problem_key] = e
+
+          problem = problems[problem_key]
+          if isinstance(problem, SearchTooLargeError):
+            errors[position] = problem
+            continue
+          try:
+            backend = self._select_backend(problem, query.engine)
+          except ValueError as e:
+            errors[position] = e
+            continue
+          if backend.name == BacktrackingBackend.name:
+            # Las búsquedas ya se reparten entre procesos; cada una se resuelve en un solo proceso
+            backend = BacktrackingBackend(parallel_threshold=sys.maxsize)
+
+          wall_deadline = started + query.time_budget_ms / 1000 if query.time_budget_ms is not None else None
+          jobs.append((backend, problem, query.max_results, wall_deadline, query.max_nodes))
+
+        results: List[Union[RankedSchedules, Exception]] = []
+        solutions = iter(zip(jobs, solve_problems(jobs)))
+        for position in range(len(queries)):
+          if position in errors:
+            results.append(errors[position])
+            continue
+
+          (_, problem, max_results, _, _), solution = next(solutions)
+          if isinstance(solution, Exception):
+            results.append(solution)
+            continue
+
+          candidates, truncated, explored_nodes = solution
+          best_schedules = TopSchedules(max_results)
+          for score, course_indices, credits_required, count in candidates:
+            best_schedules.push(score, course_indices, credits_required, count)
+
+          results.append(RankedSchedules(
+            course_classes=problem.course_classes,
+            candidates=best_schedules.ranked(),
+            max_results=max_results,
+            exhaustive=not truncated,
+            explored_nodes=explored_nodes
+          ))
+        return results
+
+    def iter_schedules(self, query: ScheduleQuery) -> Iterator[Schedule]:
+        """Genera los horarios válidos conforme se encuentran, sin ordenarlos por puntaje
+
+        Con ``max_results=None`` genera todos los horarios válidos.
+        """
+        budget = SearchBudget(time_budget_ms=query.time_budget_ms, max_nodes=query.max_nodes)
+
+        problem = self._build_problem(query, self._compile_universe(query))
+
+        concrete_schedules = (
+            (schedule_courses, leaf.credits)
+            for leaf in backtrack_schedules(problem, budget)
+            for schedule_courses in problem.concrete_schedules(leaf.course_indices)
+        )
+        for value, (schedule_courses, credits_required) in enumerate(itertools.islice(concrete_schedules, query.max_results)):
+            yield build_schedule(schedule_courses, credits_required, option=value)
+
+    def count_schedules(self, query: ScheduleQuery) -> ScheduleCountResult:
+        """Cuenta los horarios válidos sin construirlos ni ordenarlos
+
+        Ignora ``max_results`` y ``engine``. Si el presupuesto se agota, el
+        conteo es una cota inferior y se regresa con ``exhaustive=False``.
+        """
+        budget = SearchBudget(time_budget_ms=query.time_budget_ms, max_nodes=query.max_nodes)
+
+        problem = self._build_problem(query, self._compile_universe(query))
+
+        count = count_schedules(problem, budget)
+
+        return ScheduleCountResult(
+          count=count,
+          exhaustive=not budget.truncated,
+          explored_nodes=budget.explored_nodes
+        )
+
+    def _seed_surviving_schedules(
+      self,
+      previous: SolverContext,
+      problem: ScheduleSearchProblem,
+      filtered_courses: List[Course],
+      best_schedules: TopSchedules
+    ) -> bool:
+      """Siembra los horarios anteriores que siguen siendo válidos
+
+      Regresa verdadero si con ellos ya se tiene el ranking completo: la
+      búsqueda anterior fue exhaustiva y, o bien contenía todos sus horarios
+      válidos (no llenó el límite), o bien todos sus horarios siguen siendo
+      válidos y, por lo tanto, siguen siendo los mejores.
+      """
+      class_of: Dict[int, int] = {
+        id(course): index
+        for index, members in enumerate(problem.course_classes)
+        for course in members
+      }
+
+      survived = 0
+      for schedule_courses in previous.surviving_schedules(filtered_courses, problem.credits):
+        survived += 1
+        course_indices = tuple(sorted(class_of[id(course)] for course in schedule_courses))
+        if course_indices in best_schedules.seeded:
+          continue
+        best_schedules.seed(
+          sum(problem.compiled.scores[i] for i in course_indices),
+          course_indices,
+          sum(problem.compiled.credits[i] for i in course_indices),
+          problem.multiplicity(course_indices)
+        )
+
+      ranked = previous.ranked
+      return ranked.exhaustive and (len(ranked) < previous.max_results or survived == len(ranked))
+
+    def _select_backend(self, problem: ScheduleSearchProblem, engine: str) -> SolverBackend:
+      """Motor solicitado o, con ``auto``, el que conviene según el tamaño estimado de la búsqueda
+
+      Con ``auto``, a partir de ``approximate_threshold`` horarios estimados
+      (ver ``ScheduleSearchProblem.estimated_schedules``) usa la búsqueda
+      aproximada en haz, cuyo costo no depende del tamaño de la búsqueda. Las
+      búsquedas demasiado grandes ya se rechazaron al construir el problema
+      (ver ``_build_problem``).
+      """
+      estimated_schedules = problem.estimated_schedules() if problem.feasible else 0.0
+
+      if engine == AUTO_ENGINE:
+        cp_sat = self.backends.get('cp_sat')
+        if (
+            cp_sat is not None and cp_sat.available() and
+            problem.feasible and problem.estimated_size() >= self.cp_sat_threshold
+          ):
+          return cp_sat
+        if estimated_schedules >= self.approximate_threshold:
+          return self.backends[BeamSearchBackend.name]
+        return self.backends[BacktrackingBackend.name]
+
+      if engine not in self.backends:
+        raise ValueError("Motor de búsqueda desconocido: {}".format(engine))
+      return self.backends[engine]
+
+    def _build_problem(
+      self,
+      query: ScheduleQuery,
+      compiled_universe: CompiledUniverse,
+      filtered_courses: Optional[List[Course]] = None
+    ) -> ScheduleSearchProblem:
+      """Problema de búsqueda de la petición, tras aplicar el control de admisión
+
+      Todas las búsquedas pasan por aquí antes de buscar: si el número
+      estimado de horarios (ver ``ScheduleSearchProblem.estimated_schedules``)
+      llega a ``reject_threshold``, la petición se rechaza con
+      ``SearchTooLargeError``. ``filtered_courses`` son los cursos del universo
+      que pasan los filtros de la petición, si ya se calcularon.
+      """
+      if filtered_courses is None:
+        filtered_courses = self._filter_query_courses(compiled_universe, query)
+
+      problem = ScheduleSearchProblem(
+        courses=filtered_courses,
+        required_subjects=set(query.required_subject_names()),
+        n=query.n,
+        credits=query.credits,
+        universe=compiled_universe
+      )
+
+      estimated_schedules = problem.estimated_schedules() if problem.feasible else 0.0
+      if estimated_schedules >= self.reject_threshold:
+        raise SearchTooLargeError(estimated_schedules)
+      return problem
+
+    def _compile_universe(self, query: ScheduleQuery) -> CompiledUniverse:
+      """Cursos del universo de la petición compilados, desde la cache si ya se compilaron
+
+      La cache se invalida cuando cambia la versión de los datos de cursos. La
+      llave incluye la versión leída antes de consultar los cursos: si los
+      cursos cambian mientras se compilan, el universo queda guardado con la
+      versión anterior y ninguna petición posterior lo vuelve a usar.
+      """
+      if self.universe_cache is not None:
+        data_version = self.course_service.get_data_version()
+        self.universe_cache.sync_data_version(data_version)
+        universe = (query.universe_key(), data_version)
+        compiled_universe = self.universe_cache.get(universe)
+        if compiled_universe is not None:
+          return compiled_universe
+
+      compiled_universe = CompiledUniverse(self._get_courses(
+        levels=query.levels,
+        career=query.career,
+        extra_subjects=query.extra_subjects,
+        required_subjects=query.required_subjects,
+        semesters=query.semesters,
+      ))
+      if self.universe_cache is not None:
+        self.universe_cache.put(universe, compiled_universe)
+      return compiled_universe
+
+    def _filter_query_courses(self, compiled_universe: CompiledUniverse, query: ScheduleQuery) -> List[Course]:
+      return self._filter_courses(
+        courses=compiled_universe.courses,
+        start_time=query.start_time,
+        end_time=query.end_time,
+        excluded_teachers=query.excluded_teachers,
+        excluded_subjects=query.excluded_subjects,
+        min_course_availability=query.min_course_availability
+      )
+
     def _get_courses(
       self,
       career: str,
@@ -0,0 +1,57 @@
+from typing import FrozenSet, Hashable, List, NamedTuple, Optional, Tuple
+
+from schedules.application.solver_backends import AUTO_ENGINE
+
+
+class ScheduleQuery(NamedTuple):
+    """Parámetros de una búsqueda de horarios
+
+    ``levels``, ``career``, ``semesters`` y las asignaturas requeridas y extra
+    (pares ``(secuencia, asignatura)``) determinan el universo de cursos; el
+    rango de horas, los profesores y asignaturas excluidos y la disponibilidad
+    mínima, los filtros que se aplican sobre él; ``n`` y ``credits``, el
+    tamaño del horario y el presupuesto de créditos; y ``max_results``,
+    ``time_budget_ms``, ``max_nodes`` y ``engine``, cómo se realiza la búsqueda.
+    """
+    levels: List[str]
+    career: str
+    extra_subjects: List[Tuple[str, str]]
+    required_subjects: List[Tuple[str, str]]
+    semesters: List[str]
+    start_time: Optional[str]
+    end_time: Optional[str]
+    excluded_teachers: List[str]
+    excluded_subjects: List[str]
+    min_course_availability: int
+    n: int
+    credits: float
+    max_results: Optional[int] = 20
+    time_budget_ms: Optional[int] = None
+    max_nodes: Optional[int] = None
+    engine: str = AUTO_ENGINE
+
+    def universe_key(self) -> Hashable:
+        """Identifica el universo de cursos de la búsqueda: los que regresa ``ScheduleService._get_courses``"""
+        return (
+            self.career,
+            tuple(self.levels),
+            tuple(self.semesters),
+            tuple(tuple(subject) for subject in self.required_subjects),
+            tuple(tuple(subject) for subject in self.extra_subjects)
+        )
+
+    def problem_key(self) -> Hashable:
+        """Identifica el problema compilado: universo, filtros, tamaño del horario y créditos"""
+        return (
+            self.universe_key(),
+            self.start_time,
+            self.end_time,
+            tuple(self.excluded_teachers),
+            tuple(self.excluded_subjects),
+            self.min_course_availability,
+            self.n,
+            self.credits
+        )
+
+    def required_subject_names(self) -> FrozenSet[str]:
+        return frozenset(required_subject[1] for required_subject in self.required_subjects)
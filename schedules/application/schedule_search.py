@@ -0,0 +1,497 @@
+import itertools
+import os
+from array import array
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from courses.domain.model.course import Course
+from schedules.application.compiled_universe import CompiledUniverse
+from schedules.application.conflict_graph import popcount
+from schedules.application.top_schedules import TopSchedules
+from schedules.application.search_budget import SearchBudget
+
+# Holgura para comparar sumas de créditos acumuladas en distinto orden
+CREDITS_TOLERANCE = 1e-9
+
+# Máximo de estados que el conteo de horarios memoriza; al llegar a él el
+# conteo se detiene como si se agotara el presupuesto
+COUNT_MEMO_MAX_ENTRIES = int(os.environ.get('SCHEDULE_COUNT_MEMO_MAX_ENTRIES', 200_000))
+
+
+class ScheduleLeaf(NamedTuple):
+    """Horario válido encontrado por la búsqueda, expresado con índices de cursos"""
+    course_indices: Tuple[int, ...]
+    score: float
+    credits: float
+
+
+class SearchNode(NamedTuple):
+    """Estado de un nodo del árbol de búsqueda desde el que se puede reanudar
+
+    ``remaining`` es el conjunto (en bits) de asignaturas que aún no se han
+    decidido, es decir, ni elegido ni descartado.
+    """
+    schedule: Tuple[int, ...]
+    remaining: int
+    blocked: int
+    score: float
+    credits: float
+
+
+class ScheduleSearchProblem:
+    """Cursos filtrados de una petición compilados para la búsqueda de horarios
+
+    Se construye una sola vez por petición: secciones agrupadas por asignatura
+    (requeridas primero) y las cotas que usa la poda de la búsqueda. Las
+    clases de secciones equivalentes, las máscaras de franjas y los conflictos
+    por pares se comparten con las demás peticiones sobre el mismo universo de
+    cursos (ver ``CompiledUniverse``).
+
+    La búsqueda trabaja sobre un curso representativo de cada clase de
+    secciones intercambiables (ver ``course_classes``); los índices de los
+    horarios encontrados se refieren a ``courses``, es decir, a esos
+    representantes, y las clases sin cursos que pasen los filtros no tienen
+    representante.
+    """
+
+    def __init__(
+        self,
+        courses: List[Course],
+        required_subjects: Set[str],
+        n: int,
+        credits: float,
+        universe: Optional[CompiledUniverse] = None
+    ):
+        # Las clases de secciones intercambiables, sus máscaras de franjas y sus
+        # conflictos se toman del universo ya compilado (o se compilan a partir
+        # de los propios cursos si no provienen de él); los cursos filtrados
+        # solo eligen qué secciones de cada clase siguen disponibles
+        if universe is None or not universe.contains(courses):
+            universe = CompiledUniverse(courses)
+
+        self.course_classes: List[List[Course]] = universe.select(courses)
+        self.courses: List[Optional[Course]] = [members[0] if members else None for members in self.course_classes]
+        self.class_sizes = array('i', (len(members) for members in self.course_classes))
+        self.n = n
+        self.credits = credits
+        self.required_count = len(required_subjects)
+
+        # Agrupar las secciones (índices de clases con cursos disponibles) por asignatura
+        sections_by_subject: Dict[str, List[int]] = {}
+        for index, course in enumerate(self.courses):
+            if course is not None:
+                sections_by_subject.setdefault(course.subject, []).append(index)
+
+        # No hay horarios posibles si las asignaturas requeridas no caben en el
+        # horario o alguna no tiene secciones disponibles tras el filtrado
+        self.feasible = self.required_count <= n and all(
+            subject in sections_by_subject for subject in required_subjects
+        )
+
+        # Las asignaturas requeridas se colocan primero para fallar lo antes posible
+        subjects = (
+            [subject for subject in sections_by_subject if subject in required_subjects] +
+            [subject for subject in sections_by_subject if subject not in required_subjects]
+        )
+        self.subject_sections: List[List[int]] = [sections_by_subject[subject] for subject in subjects]
+
+        # Asignatura, máscara de franjas, puntaje y créditos de cada clase y los
+        # cursos con los que cada una no puede coexistir; los bits de las clases
+        # sin cursos disponibles nunca forman parte de un dominio
+        self.compiled = compiled = universe.compiled
+        self.conflicts = universe.conflicts
+
+        subject_count = len(self.subject_sections)
+        self.required_mask = (1 << self.required_count) - 1
+
+        # Secciones de cada asignatura como conjunto de bits de índices de cursos
+        self.subject_bits: List[int] = []
+        for sections in self.subject_sections:
+            bits = 0
+            for i in sections:
+                bits |= 1 << i
+            self.subject_bits.append(bits)
+
+        available = 0
+        for bits in self.subject_bits:
+            available |= bits
+
+        # Grado de conflicto de cada asignatura: cuántas secciones disponibles
+        # de otras asignaturas quedan descartadas por alguna de sus secciones
+        self.conflict_degree: List[int] = []
+        for s, sections in enumerate(self.subject_sections):
+            conflicting = 0
+            for i in sections:
+                conflicting |= self.conflicts[i]
+            self.conflict_degree.append(popcount(conflicting & available & ~self.subject_bits[s]))
+
+        # Densidad de conflictos: fracción de los pares de secciones de
+        # asignaturas distintas que no pueden coexistir en un horario
+        conflicting_pairs = 0
+        for s, sections in enumerate(self.subject_sections):
+            for i in sections:
+                conflicting_pairs += popcount(self.conflicts[i] & available & ~self.subject_bits[s])
+        section_count = sum(len(sections) for sections in self.subject_sections)
+        pairs = section_count ** 2 - sum(len(sections) ** 2 for sections in self.subject_sections)
+        self.conflict_density = conflicting_pairs / pairs if pairs else 0.0
+
+        # Mejor puntaje y mínimo de créditos por asignatura, junto con las
+        # asignaturas ordenadas por ellos para calcular las cotas de la poda
+        self.best_scores = [max(compiled.scores[i] for i in sections) for sections in self.subject_sections]
+        self.min_credits = [min(compiled.credits[i] for i in sections) for sections in self.subject_sections]
+        self.subjects_by_score = sorted(range(subject_count), key=lambda s: self.best_scores[s], reverse=True)
+        self.subjects_by_credits = sorted(range(subject_count), key=lambda s: self.min_credits[s])
+
+    def __getstate__(self) -> Dict:
+        # Los procesos de la búsqueda paralela solo usan los datos compilados,
+        # así que no se les envían los modelos Course
+        state = self.__dict__.copy()
+        state['courses'] = state['course_classes'] = None
+        return state
+
+    def root(self) -> SearchNode:
+        """Nodo inicial: horario vacío con todas las asignaturas por decidir"""
+        return SearchNode((), (1 << len(self.subject_sections)) - 1, 0, 0.0, 0.0)
+
+    def optimistic_score(self, remaining: int, count: int) -> float:
+        """Suma de los ``count`` mejores puntajes entre las asignaturas restantes"""
+        total = 0.0
+        for s in self.subjects_by_score:
+            if count == 0:
+                break
+            if (remaining >> s) & 1:
+                total += self.best_scores[s]
+                count -= 1
+        return total
+
+    def cheapest_credits(self, remaining: int, count: int) -> float:
+        """Menor cantidad de créditos con la que se pueden cubrir ``count`` asignaturas restantes"""
+        total = 0.0
+        for s in self.subjects_by_credits:
+            if count == 0:
+                break
+            if (remaining >> s) & 1:
+                total += self.min_credits[s]
+                count -= 1
+        return total
+
+    def domains(self, remaining: int, blocked: int) -> Optional[Tuple[int, List[int]]]:
+        """Dominios de las asignaturas restantes dado el conjunto de cursos bloqueados
+
+        Regresa las asignaturas restantes que aún tienen secciones compatibles
+        junto con el dominio (secciones compatibles, en bits) de cada
+        asignatura, o ``None`` si alguna asignatura requerida se quedó sin
+        secciones compatibles.
+        """
+        domains = [bits & ~blocked for bits in self.subject_bits]
+        live = remaining
+        for s, domain in enumerate(domains):
+            if (remaining >> s) & 1 and not domain:
+                if s < self.required_count:
+                    return None
+                live &= ~(1 << s)
+        return live, domains
+
+    def select_subject(self, live: int, domains: List[int]) -> int:
+        """Elige la siguiente asignatura a decidir con la heurística MRV
+
+        Se decide primero la asignatura con el dominio más pequeño (las
+        requeridas antes que las opcionales) y, en caso de empate, la de mayor
+        grado de conflicto.
+        """
+        candidates = live & self.required_mask or live
+        best_subject, best_key = -1, None
+        while candidates:
+            lowest = candidates & -candidates
+            candidates ^= lowest
+            s = lowest.bit_length() - 1
+
+            key = (popcount(domains[s]), -self.conflict_degree[s])
+            if best_key is None or key < best_key:
+                best_subject, best_key = s, key
+        return best_subject
+
+    def estimated_size(self) -> int:
+        """Cota superior barata del número de hojas del árbol de búsqueda
+
+        Cuenta las formas de elegir una sección de ``n`` asignaturas distintas
+        sin considerar traslapes ni créditos, es decir, el polinomio simétrico
+        elemental de grado ``n`` sobre el número de secciones de cada asignatura.
+        """
+        return self.choice_counts(range(len(self.subject_sections)))[self.n]
+
+    def estimated_schedules(self) -> float:
+        """Estimación barata del número de horarios sin traslapes, sin considerar créditos
+
+        Corrige ``estimated_size`` suponiendo que cada par de secciones de un
+        horario se traslapa, de forma independiente, con probabilidad
+        ``conflict_density``.
+        """
+        pairs = self.n * (self.n - 1) // 2
+        return self.estimated_size() * (1.0 - self.conflict_density) ** pairs
+
+    def choice_counts(self, subjects: Iterable[int]) -> List[int]:
+        """Formas de elegir una sección de ``k`` de las asignaturas dadas, para cada ``k <= n``"""
+        ways = [1] + [0] * self.n
+        for s in subjects:
+            for chosen in range(self.n, 0, -1):
+                ways[chosen] += ways[chosen - 1] * len(self.subject_sections[s])
+        return ways
+
+    def multiplicity(self, course_indices: Tuple[int, ...]) -> int:
+        """Número de horarios concretos que representa un horario de representantes"""
+        count = 1
+        for i in course_indices:
+            count *= self.class_sizes[i]
+        return count
+
+    def concrete_schedules(self, course_indices: Tuple[int, ...]) -> Iterator[List[Course]]:
+        """Expande un horario de representantes en los horarios concretos equivalentes"""
+        for schedule in itertools.product(*(self.course_classes[i] for i in course_indices)):
+            yield list(schedule)
+
+    def children(self, node: SearchNode) -> List[SearchNode]:
+        """Hijos directos de un nodo: una sección de la asignatura elegida o su omisión"""
+        children: List[SearchNode] = []
+        propagated = self.domains(node.remaining, node.blocked)
+        if propagated is None or len(node.schedule) >= self.n:
+            return children
+
+        live, domains = propagated
+        if not live:
+            return children
+
+        s = self.select_subject(live, domains)
+        remaining = live & ~(1 << s)
+        for i in self.subject_sections[s]:
+            if (domains[s] >> i) & 1:
+                children.append(SearchNode(
+                    node.schedule + (i,),
+                    remaining,
+                    node.blocked | self.conflicts[i],
+                    node.score + self.compiled.scores[i],
+                    node.credits + self.compiled.credits[i]
+                ))
+
+        if s >= self.required_count:
+            children.append(node._replace(remaining=remaining))
+        return children
+
+    def split(self, min_subtrees: int) -> List[SearchNode]:
+        """Divide el árbol de búsqueda en subárboles independientes
+
+        Parte de las opciones del primer nivel y expande nivel por nivel hasta
+        tener al menos ``min_subtrees`` nodos (o hasta no poder expandir más).
+        Las hojas de los subárboles resultantes cubren exactamente las del árbol.
+        """
+        frontier = [self.root()]
+        while len(frontier) < min_subtrees:
+            expanded: List[SearchNode] = []
+            progressed = False
+            for node in frontier:
+                children = self.children(node)
+                progressed = progressed or bool(children)
+                expanded.extend(children or [node])
+            if not progressed:
+                break
+            frontier = expanded
+        return frontier
+
+def backtrack_schedules(
+    problem: ScheduleSearchProblem,
+    budget: SearchBudget,
+    best_schedules: Optional[TopSchedules] = None,
+    start: Optional[SearchNode] = None
+) -> Iterator[ScheduleLeaf]:
+    """Genera los horarios válidos del problema conforme se van encontrando
+
+    Si se proporciona ``best_schedules`` se podan las ramas que ya no pueden
+    superar al peor de los mejores candidatos que contiene; quien consume el
+    generador es responsable de ir agregando los candidatos al heap. ``start``
+    permite recorrer solo el subárbol de un nodo (ver ScheduleSearchProblem.split).
+    """
+    scores = problem.compiled.scores
+    course_credits = problem.compiled.credits
+    conflicts = problem.conflicts
+    subject_sections = problem.subject_sections
+    n = problem.n
+    credits = problem.credits
+
+    required_count = problem.required_count
+
+    def backtrack(
+        schedule: List[int],
+        live: int,
+        domains: List[int],
+        positive_score: float,
+        credits_required: float
+      ) -> Iterator[ScheduleLeaf]:
+        # ``live`` son las asignaturas por decidir que aún tienen secciones
+        # compatibles; las que se quedan sin ellas se descartan de inmediato
+        # (comprobación hacia adelante) y ``domains`` guarda esas secciones
+
+        # Cortar la búsqueda si se agotó el presupuesto de tiempo o de nodos
+        if not budget.spend():
+            return
+
+        # Verificar si se ha alcanzado el tamaño objetivo del horario
+        # (las asignaturas requeridas ya están incluidas porque no se pueden omitir)
+        if len(schedule) == n:
+            if credits_required <= credits:
+                yield ScheduleLeaf(tuple(schedule), positive_score, credits_required)
+            return
+
+        # Podar si las asignaturas con secciones compatibles ya no alcanzan el tamaño objetivo
+        missing = n - len(schedule)
+        if popcount(live) < missing:
+            return
+
+        # Podar si ni las asignaturas restantes más baratas caben en los créditos disponibles
+        if credits_required + problem.cheapest_credits(live, missing) > credits + CREDITS_TOLERANCE:
+            return
+
+        # Ramificación y acotamiento: aun tomando la mejor sección de cada
+        # asignatura restante, el horario no superaría al peor de los mejores
+        if (
+            best_schedules is not None and
+            positive_score + problem.optimistic_score(live, missing) <= best_schedules.cutoff()
+        ):
+            return
+
+        # Decidir la asignatura con el dominio más pequeño: elegir una de sus
+        # secciones compatibles con los cursos ya elegidos...
+        s = problem.select_subject(live, domains)
+        live &= ~(1 << s)
+        for i in subject_sections[s]:
+            if not (domains[s] >> i) & 1:
+                continue
+
+            # Quitar la sección y sus conflictos de los dominios de las demás
+            # asignaturas, recordando los valores anteriores para restaurarlos
+            blocked = conflicts[i]
+            changed: List[Tuple[int, int]] = []
+            next_live = live
+            wiped_out = False
+            pending = live
+            while pending:
+                lowest = pending & -pending
+                pending ^= lowest
+                t = lowest.bit_length() - 1
+
+                domain = domains[t]
+                if domain & blocked:
+                    changed.append((t, domain))
+                    domain &= ~blocked
+                    domains[t] = domain
+                    if not domain:
+                        # Una asignatura requerida sin secciones compatibles es
+                        # un callejón sin salida; una opcional queda descartada
+                        if t < required_count:
+                            wiped_out = True
+                            break
+                        next_live &= ~lowest
+
+            if not wiped_out:
+                schedule.append(i)
+                yield from backtrack(
+                    schedule,
+                    next_live,
+                    domains,
+                    positive_score + scores[i],
+                    credits_required + course_credits[i]
+                )
+                schedule.pop()
+
+            for t, domain in changed:
+                domains[t] = domain
+
+        # ...o no incluir la asignatura en el horario, siempre que no sea requerida
+        if s >= required_count:
+            yield from backtrack(schedule, live, domains, positive_score, credits_required)
+
+    if problem.feasible:
+        start = start or problem.root()
+        propagated = problem.domains(start.remaining, start.blocked)
+        if propagated is not None:
+            live, domains = propagated
+            yield from backtrack(list(start.schedule), live, domains, start.score, start.credits)
+
+
+def count_schedules(
+    problem: ScheduleSearchProblem,
+    budget: SearchBudget,
+    max_memo_entries: int = COUNT_MEMO_MAX_ENTRIES
+) -> int:
+    """Cuenta los horarios concretos válidos del problema sin construirlos
+
+    Recorre las asignaturas en un orden fijo y memoriza el número de
+    completaciones de cada estado (asignatura actual, cursos elegidos, cursos
+    bloqueados entre las asignaturas restantes y créditos acumulados), de modo
+    que los horarios parciales que llegan al mismo estado se cuentan una sola
+    vez. Cada sección pesa lo que su clase de secciones equivalentes.
+
+    Si se agota el presupuesto o la memoria llega a ``max_memo_entries``
+    estados, ``budget`` se marca como truncado y el resultado es una cota
+    inferior del total.
+    """
+    if not problem.feasible:
+        return 0
+
+    course_credits = problem.compiled.credits
+    conflicts = problem.conflicts
+    subject_sections = problem.subject_sections
+    subject_count = len(subject_sections)
+    required_count = problem.required_count
+    n = problem.n
+    credits = problem.credits
+    weights = problem.class_sizes
+
+    # suffix_bits[k]: cursos de las asignaturas k en adelante; solo sus
+    # bloqueos influyen en las completaciones de un estado
+    suffix_bits = [0] * (subject_count + 1)
+    for k in range(subject_count - 1, -1, -1):
+        suffix_bits[k] = suffix_bits[k + 1] | problem.subject_bits[k]
+
+    all_subjects = (1 << subject_count) - 1
+    memo: Dict[Tuple[int, int, int, float], int] = {}
+
+    def count(k: int, chosen: int, blocked: int, credits_required: float) -> int:
+        if chosen == n:
+            return 1 if credits_required <= credits else 0
+
+        missing = n - chosen
+        if subject_count - k < missing:
+            return 0
+
+        remaining = all_subjects & ~((1 << k) - 1)
+        if credits_required + problem.cheapest_credits(remaining, missing) > credits + CREDITS_TOLERANCE:
+            return 0
+
+        key = (k, chosen, blocked & suffix_bits[k], credits_required)
+        if key in memo:
+            return memo[key]
+
+        if len(memo) >= max_memo_entries:
+            budget.truncated = True
+        if not budget.spend():
+            return 0
+
+        total = 0
+        for i in subject_sections[k]:
+            if not (blocked >> i) & 1:
+                total += weights[i] * count(
+                    k + 1,
+                    chosen + 1,
+                    blocked | conflicts[i],
+                    credits_required + course_credits[i]
+                )
+
+        # Las asignaturas requeridas no se pueden omitir
+        if k >= required_count:
+            total += count(k + 1, chosen, blocked, credits_required)
+
+        # Un conteo cortado por el presupuesto es parcial y no se reutiliza
+        if not budget.truncated:
+            memo[key] = total
+        return total
+
+    return count(0, 0, 0, 0.0)
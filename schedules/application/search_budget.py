@@ -0,0 +1,57 @@
+import time
+from typing import List, Optional
+
+# Cada cuántos nodos se consulta el reloj para no pagar una llamada por nodo
+CLOCK_CHECK_INTERVAL = 256
+
+
+class SearchBudget:
+    """Presupuesto de tiempo y/o nodos para una búsqueda de horarios
+
+    Permite cortar la búsqueda en cualquier momento conservando los mejores
+    horarios encontrados hasta entonces. ``truncated`` indica si la búsqueda se
+    detuvo antes de recorrer todo el árbol.
+    """
+
+    def __init__(
+        self,
+        time_budget_ms: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        wall_deadline: Optional[float] = None
+    ):
+        # ``wall_deadline`` es un instante absoluto (``time.time()``), válido
+        # entre procesos; se convierte al reloj monótono del proceso actual
+        deadlines: List[float] = []
+        if time_budget_ms is not None:
+            deadlines.append(time.monotonic() + time_budget_ms / 1000)
+        if wall_deadline is not None:
+            deadlines.append(time.monotonic() + (wall_deadline - time.time()))
+        self.deadline: Optional[float] = min(deadlines) if deadlines else None
+        self.max_nodes = max_nodes
+        self.explored_nodes = 0
+        self.truncated = False
+
+    def spend(self) -> bool:
+        """Registra un nodo visitado; regresa False si ya no queda presupuesto"""
+        if self.truncated:
+            return False
+
+        if self.max_nodes is not None and self.explored_nodes >= self.max_nodes:
+            self.truncated = True
+            return False
+
+        self.explored_nodes += 1
+        if (
+            self.deadline is not None and
+            self.explored_nodes % CLOCK_CHECK_INTERVAL == 0 and
+            time.monotonic() > self.deadline
+        ):
+            self.truncated = True
+
+        return not self.truncated
+
+    def wall_deadline(self) -> Optional[float]:
+        """Límite de tiempo como instante absoluto (``time.time()``), para compartirlo con otros procesos"""
+        if self.deadline is None:
+            return None
+        return time.time() + (self.deadline - time.monotonic())
@@ -0,0 +1,56 @@
+import os
+
+from schedules.domain.ports.solver_backend import SolverBackend
+from schedules.application.top_schedules import TopSchedules
+from schedules.application.search_budget import SearchBudget
+from schedules.application.schedule_search import ScheduleSearchProblem, backtrack_schedules
+from schedules.application.parallel_search import parallel_search, PARALLEL_SEARCH_THRESHOLD
+from schedules.application.beam_search import beam_search_schedules, BEAM_WIDTH
+
+# Nombre del motor que se elige automáticamente según el tamaño estimado
+AUTO_ENGINE = 'auto'
+
+# Tamaño estimado del árbol a partir del cual, con la selección automática, se
+# usa el motor de programación con restricciones (si está registrado y disponible)
+CP_SAT_THRESHOLD = int(os.environ.get('SCHEDULE_CP_SAT_THRESHOLD', 10_000_000_000))
+
+# Control de admisión por número estimado de horarios sin traslapes (ver
+# ScheduleSearchProblem.estimated_schedules): a partir del primer umbral la
+# selección automática usa la búsqueda aproximada en haz, y a partir del
+# segundo la petición se rechaza sin buscar
+APPROXIMATE_THRESHOLD = float(os.environ.get('SCHEDULE_APPROXIMATE_THRESHOLD', 1e12))
+REJECT_THRESHOLD = float(os.environ.get('SCHEDULE_REJECT_THRESHOLD', 1e18))
+
+
+class BacktrackingBackend(SolverBackend):
+    """Backtracking con MRV, comprobación hacia adelante y ramificación y acotamiento
+
+    A partir de ``parallel_threshold`` (tamaño estimado del árbol) la búsqueda
+    se reparte entre un pool de procesos.
+    """
+
+    name = 'backtracking'
+
+    def __init__(self, parallel_threshold: int = PARALLEL_SEARCH_THRESHOLD):
+        self.parallel_threshold = parallel_threshold
+
+    def solve(self, problem: ScheduleSearchProblem, budget: SearchBudget, best_schedules: TopSchedules) -> None:
+        if problem.feasible and problem.estimated_size() >= self.parallel_threshold:
+            parallel_search(problem, budget, best_schedules)
+            return
+
+        for leaf in backtrack_schedules(problem, budget, best_schedules):
+            best_schedules.push(leaf.score, leaf.course_indices, leaf.credits, problem.multiplicity(leaf.course_indices))
+
+
+class BeamSearchBackend(SolverBackend):
+    """Búsqueda aproximada en haz: costo acotado, pero sin garantía de encontrar los mejores horarios"""
+
+    name = 'beam'
+
+    def __init__(self, beam_width: int = BEAM_WIDTH):
+        self.beam_width = beam_width
+
+    def solve(self, problem: ScheduleSearchProblem, budget: SearchBudget, best_schedules: TopSchedules) -> None:
+        for leaf in beam_search_schedules(problem, budget, self.beam_width):
+            best_schedules.push(leaf.score, leaf.course_indices, leaf.credits, problem.multiplicity(leaf.course_indices))
@@ -0,0 +1,66 @@
+from typing import FrozenSet, Hashable, Iterator, List
+
+from courses.domain.model.course import Course
+from schedules.application.compiled_universe import CompiledUniverse
+from schedules.application.ranked_schedules import RankedSchedules
+
+
+class SolverContext:
+    """Última búsqueda de una sesión, conservada para refinarla sin empezar de cero
+
+    Guarda el universo compilado de la petición (los cursos obtenidos del
+    repositorio para su carrera, niveles, semestres y asignaturas requeridas y
+    extra), los cursos que pasaron los filtros y el ranking obtenido.
+    """
+
+    def __init__(
+        self,
+        universe: Hashable,
+        compiled_universe: CompiledUniverse,
+        filtered_courses: List[Course],
+        n: int,
+        required_subjects: FrozenSet[str],
+        credits: float,
+        max_results: int,
+        ranked: RankedSchedules
+    ):
+        self.universe = universe
+        self.compiled_universe = compiled_universe
+        # Los cursos filtrados se identifican por instancia: todos provienen del universo
+        self.filtered_ids = frozenset(id(course) for course in filtered_courses)
+        self.n = n
+        self.required_subjects = required_subjects
+        self.credits = credits
+        self.max_results = max_results
+        self.ranked = ranked
+
+    def is_tightened_by(
+        self,
+        filtered_courses: List[Course],
+        n: int,
+        required_subjects: FrozenSet[str],
+        credits: float,
+        max_results: int
+    ) -> bool:
+        """Indica si una nueva búsqueda solo restringe a esta
+
+        Es así cuando usa un subconjunto de los cursos filtrados y a lo más los
+        mismos créditos, con el mismo tamaño de horario y asignaturas
+        requeridas; entonces todo horario válido de la nueva búsqueda también
+        lo era de esta. La nueva búsqueda puede pedir menos horarios (p. ej.
+        la primera página después de haber paginado), pero no más.
+        """
+        return (
+            n == self.n and
+            required_subjects == self.required_subjects and
+            credits <= self.credits and
+            max_results <= self.max_results and
+            all(id(course) in self.filtered_ids for course in filtered_courses)
+        )
+
+    def surviving_schedules(self, filtered_courses: List[Course], credits: float) -> Iterator[List[Course]]:
+        """Horarios del ranking anterior que siguen siendo válidos con los nuevos filtros"""
+        allowed = {id(course) for course in filtered_courses}
+        for schedule_courses, credits_required in self.ranked.concrete_schedules():
+            if credits_required <= credits and all(id(course) in allowed for course in schedule_courses):
+                yield schedule_courses
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, NamedTuple
+
+SOLVER_WORKERS = int(os.environ.get('SCHEDULE_SOLVER_WORKERS', 2))
+SOLVER_MAX_QUEUE = int(os.environ.get('SCHEDULE_SOLVER_MAX_QUEUE', 32))
+
+
+class SolverQueueFullError(Exception):
+    """La cola de espera del pool de generación de horarios está llena"""
+    pass
+
+
+class SolverRun(NamedTuple):
+    value: Any
+    wait_ms: float
+
+
+class SolverPool:
+    """Pool acotado de hilos para la generación de horarios
+
+    Saca del event loop la búsqueda (CPU) y las consultas bloqueantes a MongoDB,
+    limita cuántas búsquedas corren a la vez y cuántas pueden esperar turno, y
+    lleva métricas de la cola para poder observar la saturación.
+    """
+
+    def __init__(self, max_workers: int = SOLVER_WORKERS, max_queue: int = SOLVER_MAX_QUEUE):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='schedule-solver')
+
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> SolverRun:
+        """Ejecuta ``fn`` en el pool y regresa su resultado junto con el tiempo que esperó turno
+
+        Lanza SolverQueueFullError si ya hay ``max_queue`` trabajos esperando.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> 'Future[SolverRun]':
+        """Encola ``fn`` en el pool sin esperar su resultado (ver ``run``)
+
+        Lanza SolverQueueFullError de inmediato si ya hay ``max_queue``
+        trabajos esperando, p. ej. para responder 503 antes de empezar un
+        streaming.
+        """
+        with self.lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise SolverQueueFullError()
+            self.queued += 1
+
+        submitted_at = time.monotonic()
+
+        def job() -> SolverRun:
+            wait_ms = (time.monotonic() - submitted_at) * 1000
+            with self.lock:
+                self.queued -= 1
+                self.running += 1
+                self.total_wait_ms += wait_ms
+                self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            try:
+                return SolverRun(fn(*args, **kwargs), wait_ms)
+            finally:
+                with self.lock:
+                    self.running -= 1
+                    self.completed += 1
+
+        return self.executor.submit(job)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            started = self.completed + self.running
+            return {
+                'workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'running': self.running,
+                'queued': self.queued,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'avg_wait_ms': self.total_wait_ms / started if started else 0.0,
+                'max_wait_ms': self.max_wait_ms,
+            }
@@ -0,0 +1,46 @@
+from typing import Dict, List
+
+from courses.domain.model.course import Course
+
+
+class TimeSlotEncoder:
+    """Codifica el horario semanal de un curso como una máscara de bits
+
+    Las franjas se construyen a partir de las horas de inicio y fin que aparecen
+    en el conjunto de cursos, de modo que dos sesiones se traslapan si y solo si
+    sus máscaras comparten algún bit. Se conserva así exactamente la misma
+    semántica que la comparación de cadenas 'HH:MM' sin depender de una
+    granularidad fija (30 minutos, 15 minutos, etc.).
+    """
+
+    def __init__(self, courses: List[Course]):
+        boundaries = sorted({
+            time
+            for course in courses
+            for session in course.schedule
+            for time in (session['start_time'], session['end_time'])
+        })
+
+        self.boundary_index: Dict[str, int] = {
+            boundary: index for index, boundary in enumerate(boundaries)
+        }
+        self.slots_per_day: int = max(len(boundaries) - 1, 1)
+        self.day_offsets: Dict[str, int] = {}
+
+    def encode(self, course: Course) -> int:
+        """Regresa la máscara de ocupación semanal del curso"""
+        mask = 0
+        for session in course.schedule:
+            day_offset = self.day_offsets.setdefault(
+                session['day'],
+                len(self.day_offsets) * self.slots_per_day
+            )
+            first_slot = self.boundary_index[session['start_time']]
+            last_slot = self.boundary_index[session['end_time']]
+
+            if last_slot > first_slot:
+                mask |= ((1 << (last_slot - first_slot)) - 1) << (day_offset + first_slot)
+        return mask
+
+    def encode_all(self, courses: List[Course]) -> List[int]:
+        return [self.encode(course) for course in courses]
@@ -0,0 +1,72 @@
+import heapq
+import math
+from typing import List, NamedTuple, Set, Tuple
+
+
+class ScheduleCandidate(NamedTuple):
+    """Horario candidato ligero: índices de los cursos elegidos y sus totales
+
+    ``order`` es negativo y decrece con cada candidato, de modo que ante un
+    empate en puntaje se conserva el candidato encontrado primero. ``count`` es
+    el número de horarios concretos equivalentes que representa el candidato.
+    """
+    score: float
+    order: int
+    course_indices: Tuple[int, ...]
+    credits: float
+    count: int = 1
+
+
+class TopSchedules:
+    """Conserva únicamente los ``capacity`` mejores horarios en un heap mínimo acotado
+
+    Un candidato puede representar varios horarios equivalentes (``count``); el
+    peor candidato solo se descarta cuando los demás ya cubren la capacidad.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.heap: List[ScheduleCandidate] = []
+        self.pushed = 0
+        self.size = 0
+        # Cursos (ordenados) de los candidatos sembrados; se ignoran si se vuelven a encontrar
+        self.seeded: Set[Tuple[int, ...]] = set()
+
+    def push(self, score: float, course_indices: Tuple[int, ...], credits: float, count: int = 1) -> None:
+        if self.seeded and tuple(sorted(course_indices)) in self.seeded:
+            return
+
+        candidate = ScheduleCandidate(score, -self.pushed, course_indices, credits, count)
+        self.pushed += 1
+
+        if self.capacity <= 0 or (self.is_full() and not candidate > self.heap[0]):
+            return
+
+        heapq.heappush(self.heap, candidate)
+        self.size += count
+        while self.size - self.heap[0].count >= self.capacity:
+            self.size -= heapq.heappop(self.heap).count
+
+    def seed(self, score: float, course_indices: Tuple[int, ...], credits: float, count: int = 1) -> None:
+        """Agrega un candidato conocido antes de buscar, p. ej. de una búsqueda anterior
+
+        Eleva desde el inicio el puntaje que la búsqueda tiene que superar; si
+        la búsqueda vuelve a encontrar el mismo horario no se cuenta dos veces.
+        """
+        self.push(score, course_indices, credits, count)
+        self.seeded.add(tuple(sorted(course_indices)))
+
+    def is_full(self) -> bool:
+        return self.size >= self.capacity
+
+    def cutoff(self) -> float:
+        """Puntaje que un nuevo candidato tiene que superar para entrar al heap"""
+        if not self.is_full():
+            return -math.inf
+        if not self.heap:
+            return math.inf
+        return self.heap[0].score
+
+    def ranked(self) -> List[ScheduleCandidate]:
+        """Candidatos ordenados del mejor al peor puntuado"""
+        return sorted(self.heap, reverse=True)
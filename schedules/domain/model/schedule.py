@@ -6,4 +6,21 @@ class Schedule(BaseModel):
   option: Optional[int] = Field("Opción", description="Número de opción")
   courses: List[Course] = Field(title="Cursos", description="Cursos que conforman el horario")
   avg_positive_score: float = Field(title="Puntaje positivo", description="Promedio del puntaje positivo de todos los profesores que imparten las asignaturas que conforman el horario.")
-  total_credits_required: float = Field(title="Total de creditos requeridos", description="Creditones necesarios para meter el horario.")
\ No newline at end of file
+  total_credits_required: float = Field(title="Total de creditos requeridos", description="Creditones necesarios para meter el horario.")
+
+class ScheduleSearchResult(BaseModel):
+  schedules: List[Schedule] = Field(title="Horarios", description="Mejores horarios encontrados, de mejor a peor puntuado.")
+  exhaustive: bool = Field(title="Búsqueda exhaustiva", description="Indica si se recorrió todo el espacio de búsqueda o si se cortó por el presupuesto de tiempo o de nodos.")
+  explored_nodes: int = Field(title="Nodos explorados", description="Número de nodos del árbol de búsqueda que se visitaron.")
+
+class ScheduleBatchResult(BaseModel):
+  schedules: List[Schedule] = Field(default=[], title="Horarios", description="Mejores horarios encontrados, de mejor a peor puntuado; vacío si la petición falló.")
+  exhaustive: bool = Field(default=False, title="Búsqueda exhaustiva", description="Indica si se recorrió todo el espacio de búsqueda o si se cortó por el presupuesto de tiempo o de nodos.")
+  explored_nodes: int = Field(default=0, title="Nodos explorados", description="Número de nodos del árbol de búsqueda que se visitaron.")
+  status_code: int = Field(default=200, title="Código de estado", description="Código HTTP que habría regresado la petición por sí sola: 200, 422 si es demasiado grande o 501 si su motor no está disponible.")
+  error: Optional[str] = Field(default=None, title="Error", description="Motivo por el que la petición no se resolvió.")
+
+class ScheduleCountResult(BaseModel):
+  count: int = Field(title="Horarios posibles", description="Número de horarios válidos que cumplen con la petición.")
+  exhaustive: bool = Field(title="Conteo exacto", description="Indica si se recorrió todo el espacio de búsqueda; si es falso, el conteo es una cota inferior.")
+  explored_nodes: int = Field(title="Nodos explorados", description="Número de estados del conteo que se visitaron.")
@@ -1,3 +1,4 @@
 from schedules.domain.ports.schedule_scraper_port import ScheduleScraperPort
+from schedules.domain.ports.solver_backend import SolverBackend, SolverUnavailableError, SearchTooLargeError
 
-__all__ = ['ScheduleScraperPort']
+__all__ = ['ScheduleScraperPort', 'SolverBackend', 'SolverUnavailableError', 'SearchTooLargeError']
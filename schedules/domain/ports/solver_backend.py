@@ -0,0 +1,62 @@
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from schedules.application.schedule_search import ScheduleSearchProblem
+    from schedules.application.search_budget import SearchBudget
+    from schedules.application.top_schedules import TopSchedules
+
+
+class SolverUnavailableError(RuntimeError):
+    """El motor de búsqueda solicitado no está disponible (falta una dependencia opcional)"""
+
+
+class SearchTooLargeError(ValueError):
+    """La búsqueda estimada es demasiado grande para resolverse a tiempo; hay que acotar la petición"""
+
+    def __init__(self, estimated_schedules: float):
+        super().__init__(
+            "La búsqueda es demasiado grande (aprox. {:.0e} horarios posibles). Acota la petición: "
+            "elige menos niveles o semestres, agrega asignaturas requeridas, excluye profesores o "
+            "asignaturas, acorta el rango de horas o reduce el número de asignaturas.".format(estimated_schedules)
+        )
+        self.estimated_schedules = estimated_schedules
+
+
+class SolverBackend(ABC):
+    """Puerto (interfaz) para los motores de búsqueda de horarios - Arquitectura Hexagonal
+
+    Define el contrato que deben cumplir los adaptadores que resuelven un
+    problema de horarios ya compilado (backtracking, programación con
+    restricciones, etc.), de modo que ``ScheduleService`` no dependa de un
+    algoritmo en particular.
+    """
+
+    # Nombre con el que se selecciona el motor en las peticiones
+    name: str = ''
+
+    def available(self) -> bool:
+        """Indica si las dependencias del motor están instaladas"""
+        return True
+
+    @abstractmethod
+    def solve(
+        self,
+        problem: 'ScheduleSearchProblem',
+        budget: 'SearchBudget',
+        best_schedules: 'TopSchedules'
+    ) -> None:
+        """Busca los mejores horarios del problema y los agrega a ``best_schedules``
+
+        Args:
+            problem: Cursos filtrados de la petición compilados para la búsqueda
+            budget: Presupuesto de tiempo y nodos; el motor debe marcarlo como
+                truncado si no pudo terminar la búsqueda
+            best_schedules: Heap acotado donde se agregan los candidatos, con
+                índices de ``problem.courses`` y su multiplicidad
+
+        Raises:
+            SolverUnavailableError: Si el motor depende de una biblioteca que
+                no está instalada
+        """
+        pass
@@ -0,0 +1,117 @@
+import importlib.util
+import math
+import time
+from typing import Dict, List
+
+from schedules.domain.ports.solver_backend import SolverBackend, SolverUnavailableError
+from schedules.application.top_schedules import TopSchedules
+from schedules.application.search_budget import SearchBudget
+from schedules.application.schedule_search import CREDITS_TOLERANCE, ScheduleSearchProblem
+
+# CP-SAT solo trabaja con enteros: créditos y puntajes se escalan y redondean
+CREDITS_SCALE = 100
+SCORE_SCALE = 1_000_000
+
+
+class CpSatBackend(SolverBackend):
+    """Programación con restricciones con OR-Tools CP-SAT (se importa solo al resolver)
+
+    Modelo: una variable booleana por sección, a lo más una sección por
+    asignatura (exactamente una si es requerida), a lo más un curso por
+    franja, exactamente ``n`` cursos, el presupuesto de créditos y como
+    objetivo maximizar la suma de puntajes. Los siguientes mejores horarios
+    se obtienen resolviendo de nuevo tras excluir cada solución encontrada.
+
+    El presupuesto se traduce a los límites de CP-SAT: el tiempo restante a
+    ``max_time_in_seconds`` y los nodos restantes a ``max_number_of_conflicts``;
+    cada resolución cuenta al menos un nodo.
+    """
+
+    name = 'cp_sat'
+
+    def available(self) -> bool:
+        # Se consulta sin importar OR-Tools, que solo se carga al resolver
+        return importlib.util.find_spec('ortools') is not None
+
+    def solve(self, problem: ScheduleSearchProblem, budget: SearchBudget, best_schedules: TopSchedules) -> None:
+        try:
+            from ortools.sat.python import cp_model
+        except ImportError:
+            raise SolverUnavailableError(
+                "El motor cp_sat requiere OR-Tools; instálalo con `pip install ortools`."
+            )
+
+        if not problem.feasible or best_schedules.capacity <= 0:
+            return
+
+        compiled = problem.compiled
+        model = cp_model.CpModel()
+        # Solo las clases con cursos disponibles participan en el modelo
+        selected = {
+            i: model.NewBoolVar('x{}'.format(i))
+            for sections in problem.subject_sections
+            for i in sections
+        }
+
+        for s, sections in enumerate(problem.subject_sections):
+            if s < problem.required_count:
+                model.Add(sum(selected[i] for i in sections) == 1)
+            else:
+                model.Add(sum(selected[i] for i in sections) <= 1)
+
+        # Cursos que ocupan cada franja de la semana
+        courses_by_slot: Dict[int, List[int]] = {}
+        for i in selected:
+            mask = compiled.masks[i]
+            while mask:
+                lowest = mask & -mask
+                mask ^= lowest
+                courses_by_slot.setdefault(lowest.bit_length() - 1, []).append(i)
+        for courses in courses_by_slot.values():
+            if len(courses) > 1:
+                model.Add(sum(selected[i] for i in courses) <= 1)
+
+        model.Add(sum(selected.values()) == problem.n)
+        model.Add(
+            sum(round(compiled.credits[i] * CREDITS_SCALE) * selected[i] for i in selected) <=
+            math.floor((problem.credits + CREDITS_TOLERANCE) * CREDITS_SCALE)
+        )
+        model.Maximize(sum(round(compiled.scores[i] * SCORE_SCALE) * selected[i] for i in selected))
+
+        solver = cp_model.CpSolver()
+        while not best_schedules.is_full():
+            if budget.deadline is not None:
+                remaining_seconds = budget.deadline - time.monotonic()
+                if remaining_seconds <= 0:
+                    budget.truncated = True
+                    return
+                solver.parameters.max_time_in_seconds = remaining_seconds
+            if budget.max_nodes is not None:
+                remaining_nodes = budget.max_nodes - budget.explored_nodes
+                if remaining_nodes <= 0:
+                    budget.truncated = True
+                    return
+                solver.parameters.max_number_of_conflicts = remaining_nodes
+
+            status = solver.Solve(model)
+            budget.explored_nodes += max(solver.NumBranches(), 1)
+            if status == cp_model.INFEASIBLE:
+                return
+            if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                # Se agotó el tiempo o los nodos sin encontrar otra solución
+                budget.truncated = True
+                return
+            if status == cp_model.FEASIBLE:
+                # La solución no está demostrada como óptima
+                budget.truncated = True
+
+            course_indices = tuple(sorted(i for i in selected if solver.Value(selected[i])))
+            best_schedules.push(
+                sum(compiled.scores[i] for i in course_indices),
+                course_indices,
+                sum(compiled.credits[i] for i in course_indices),
+                problem.multiplicity(course_indices)
+            )
+
+            # Excluir esta solución para obtener la siguiente mejor
+            model.Add(sum(selected[i] for i in course_indices) <= problem.n - 1)
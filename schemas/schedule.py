@@ -36,6 +36,12 @@ class Semester(str, Enum):
   seven = '7'
   eight = '8'
 
+class SolverEngine(str, Enum):
+  auto = 'auto'
+  backtracking = 'backtracking'
+  cp_sat = 'cp_sat'
+  beam = 'beam'
+
 class ScheduleGeneratorRequest(BaseModel):
   career: Career = Field(title="Carrera", description="Letra que identifica la carrera a la que perteneceran los horarios generados")
   levels: List[Level] = Field(title="Niveles", description="Arreglo de niveles a los que pertenecen los cursos que van a conformar los horarios generados.", min_items=1)
@@ -81,6 +87,38 @@ class ScheduleGeneratorRequest(BaseModel):
     description="Utiliza este parámetro para extender el conjunto de asignaturas capaces de formar parte de los horarios generados, incluyendo materias de otros semestres o turnos.",
     min_length=0, default=[]
   )
+  time_budget_ms: int = Field(
+    title="Presupuesto de tiempo",
+    description="Tiempo máximo en milisegundos que se dedicará a buscar horarios. Al agotarse se regresan los mejores horarios encontrados hasta ese momento.",
+    gt=0, le=60000, default=20000
+  )
+  max_nodes: Optional[int] = Field(
+    title="Máximo de nodos",
+    description="Número máximo de nodos del árbol de búsqueda que se explorarán.",
+    gt=0, default=None
+  )
+  engine: SolverEngine = Field(
+    title="Motor de búsqueda",
+    description="Motor con el que se buscan los horarios. Con 'auto' se elige según el tamaño estimado de la búsqueda; 'beam' es una búsqueda aproximada más rápida que no garantiza los mejores horarios; 'cp_sat' requiere OR-Tools instalado en el servidor.",
+    default=SolverEngine.auto
+  )
+  session_id: Optional[str] = Field(
+    title="Sesión de búsqueda",
+    description="Identificador elegido por el cliente para refinar sus búsquedas: si la petición solo restringe los filtros de la anterior de la misma sesión, se reutiliza su resultado en lugar de buscar desde cero.",
+    default=None
+  )
+  cursor: Optional[str] = Field(
+    title="Cursor",
+    description="Cursor opaco recibido en la cabecera X-Next-Cursor para obtener la siguiente página de horarios.",
+    default=None
+  )
+
+class ScheduleBatchRequest(BaseModel):
+  requests: List[ScheduleGeneratorRequest] = Field(
+    title="Peticiones",
+    description="Peticiones de horarios que se resuelven juntas; las que comparten carrera, niveles, semestres y asignaturas requeridas y extra consultan sus cursos una sola vez. Se ignoran session_id y cursor.",
+    min_items=1, max_items=50
+  )
   
 class CoursesRequest(BaseModel):
   career: Career = Field(title="Carrera", description="Letra que identifica la carrera")
@@ -226,3 +264,16 @@ class AvailabilityDownloadResponse(BaseModel):
   message: str
   availabilities: List[Dict[str, Any]]
   total_updated: int
+
+
+
+class SolverPoolStats(BaseModel):
+  """Estado del pool que ejecuta la generación de horarios"""
+  workers: int = Field(description="Número máximo de búsquedas simultáneas")
+  max_queue: int = Field(description="Número máximo de peticiones en espera")
+  running: int = Field(description="Búsquedas en ejecución")
+  queued: int = Field(description="Peticiones esperando turno")
+  completed: int = Field(description="Búsquedas terminadas")
+  rejected: int = Field(description="Peticiones rechazadas por cola llena")
+  avg_wait_ms: float = Field(description="Tiempo promedio de espera en cola (ms)")
+  max_wait_ms: float = Field(description="Tiempo máximo de espera en cola (ms)")
@@ -103,3 +103,8 @@ class TestCourseService(unittest.TestCase):
         
         self.assertEqual(result, [self.course1])
         self.course_repository.get_courses.assert_called_with(levels=["5"], shifts=shifts, career="C", semesters=["5"], subjects=[subject])
+
+    def test_get_data_version(self):
+        self.course_repository.get_data_version.return_value = 7
+        
+        self.assertEqual(self.course_service.get_data_version(), 7)
@@ -0,0 +1,33 @@
+from courses.domain.model.course import Course
+
+def build_course(
+  sequence='5CM50',
+  subject='PROGRAMACIÓN WEB',
+  day='MONDAY',
+  score=0.5,
+  start_time='07:00',
+  end_time='08:30',
+  schedule=None,
+  credits=6,
+  availability=40,
+  teacher=None
+):
+  """Curso de prueba del grupo ``sequence`` con una sesión el ``day`` o las sesiones de ``schedule``
+
+  El nivel, el turno y el semestre se toman de ``sequence`` y el profesor
+  es ``'PROFESOR ' + sequence`` si no se indica otro.
+  """
+  return Course(
+    career='C',
+    course_availability=availability,
+    level=sequence[0],
+    plan='21',
+    required_credits=credits,
+    schedule=schedule if schedule is not None else [{'day': day, 'start_time': start_time, 'end_time': end_time}],
+    semester=sequence[3],
+    sequence=sequence,
+    shift=sequence[2],
+    subject=subject,
+    teacher=teacher if teacher is not None else 'PROFESOR ' + sequence,
+    teacher_positive_score=score
+  )
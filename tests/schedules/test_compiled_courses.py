@@ -0,0 +1,33 @@
+import pickle
+import unittest
+from schedules.application.compiled_courses import CompiledCourses
+from schedules.application.schedule_search import ScheduleSearchProblem
+from tests.factories import build_course
+
+class TestCompiledCourses(unittest.TestCase):
+  def setUp(self):
+    self.courses = [
+      build_course(subject='PROGRAMACIÓN WEB', day='MONDAY', score=0.9, credits=7.5),
+      build_course(subject='BASES DE DATOS', day='MONDAY', score=0.4, credits=6),
+      build_course(subject='PROGRAMACIÓN WEB', day='TUESDAY', score=0.7, credits=7.5),
+    ]
+
+  def test_arrays_are_parallel_to_courses(self):
+    compiled = CompiledCourses(self.courses, {'BASES DE DATOS': 0, 'PROGRAMACIÓN WEB': 1})
+    
+    self.assertEqual(len(compiled), 3)
+    self.assertEqual(list(compiled.subject_ids), [1, 0, 1])
+    self.assertEqual(list(compiled.scores), [0.9, 0.4, 0.7])
+    self.assertEqual(list(compiled.credits), [7.5, 6.0, 7.5])
+    self.assertTrue(compiled.masks[0] & compiled.masks[1])
+    self.assertFalse(compiled.masks[0] & compiled.masks[2])
+
+  def test_pickled_problem_keeps_only_compiled_data(self):
+    problem = ScheduleSearchProblem(self.courses, set(), n=2, credits=100)
+    
+    restored = pickle.loads(pickle.dumps(problem))
+    
+    self.assertIsNone(restored.courses)
+    self.assertEqual(list(restored.compiled.scores), list(problem.compiled.scores))
+    self.assertEqual(restored.conflicts, problem.conflicts)
+    self.assertEqual(restored.multiplicity((0, 1)), 1)
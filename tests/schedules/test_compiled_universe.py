@@ -0,0 +1,51 @@
+import unittest
+from schedules.application.compiled_universe import CompiledUniverse
+from schedules.application.search_budget import SearchBudget
+from schedules.application.schedule_search import ScheduleSearchProblem, backtrack_schedules
+from tests.factories import build_course
+
+class TestCompiledUniverse(unittest.TestCase):
+  def setUp(self):
+    self.courses = [
+      build_course('5CM50', 'PROGRAMACIÓN WEB', 'MONDAY', 0.9),
+      build_course('5CM51', 'PROGRAMACIÓN WEB', 'MONDAY', 0.9, teacher='GARCÍA LÓPEZ CARLOS'),
+      build_course('5CM50', 'BASES DE DATOS', 'MONDAY', 0.4),
+      build_course('5CM51', 'BASES DE DATOS', 'TUESDAY', 0.6),
+      build_course('5CM50', 'REDES', 'WEDNESDAY', 0.7),
+    ]
+    self.universe = CompiledUniverse(self.courses)
+
+  def schedules(self, problem):
+    leaves = backtrack_schedules(problem, SearchBudget())
+    return sorted(
+      sorted(course.sequence + course.subject for course in schedule)
+      for leaf in leaves
+      for schedule in problem.concrete_schedules(leaf.course_indices)
+    )
+
+  def test_equivalent_sections_share_a_class(self):
+    self.assertEqual(len(self.universe), 4)
+    self.assertEqual(self.universe.class_of[id(self.courses[0])], self.universe.class_of[id(self.courses[1])])
+    self.assertEqual(self.universe.subjects, ['PROGRAMACIÓN WEB', 'BASES DE DATOS', 'REDES'])
+
+  def test_select_keeps_only_given_sections(self):
+    members = self.universe.select([self.courses[1], self.courses[4]])
+    
+    self.assertEqual(members, [[self.courses[1]], [], [], [self.courses[4]]])
+    self.assertTrue(self.universe.contains([self.courses[1]]))
+    self.assertFalse(self.universe.contains([build_course('5CM50', 'REDES', 'WEDNESDAY', 0.7)]))
+
+  def test_filtered_problem_matches_compiling_from_scratch(self):
+    filtered = [self.courses[0], self.courses[2], self.courses[3]]
+    
+    shared = ScheduleSearchProblem(filtered, {'BASES DE DATOS'}, n=2, credits=100, universe=self.universe)
+    fresh = ScheduleSearchProblem(filtered, {'BASES DE DATOS'}, n=2, credits=100)
+    
+    self.assertIs(shared.conflicts, self.universe.conflicts)
+    self.assertEqual(shared.estimated_size(), fresh.estimated_size())
+    self.assertEqual(self.schedules(shared), self.schedules(fresh))
+
+  def test_required_subject_filtered_out_is_infeasible(self):
+    problem = ScheduleSearchProblem(self.courses[:2], {'REDES'}, n=2, credits=100, universe=self.universe)
+    
+    self.assertFalse(problem.feasible)
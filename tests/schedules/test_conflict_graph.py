@@ -0,0 +1,24 @@
+import unittest
+from schedules.application.conflict_graph import build_conflict_bitsets, popcount
+
+class TestBuildConflictBitsets(unittest.TestCase):
+  def test_same_subject_sections_conflict(self):
+    conflicts = build_conflict_bitsets(['ALGORITMOS', 'ALGORITMOS', 'REDES'], [0b001, 0b010, 0b100])
+    
+    self.assertEqual(conflicts[0], 0b011)
+    self.assertEqual(conflicts[1], 0b011)
+    self.assertEqual(conflicts[2], 0b100)
+
+  def test_overlapping_masks_conflict_symmetrically(self):
+    conflicts = build_conflict_bitsets(['ALGORITMOS', 'REDES', 'BASES DE DATOS'], [0b0011, 0b0110, 0b1000])
+    
+    self.assertTrue(conflicts[0] >> 1 & 1)
+    self.assertTrue(conflicts[1] >> 0 & 1)
+    self.assertFalse(conflicts[0] >> 2 & 1)
+    self.assertFalse(conflicts[2] >> 1 & 1)
+
+class TestPopcount(unittest.TestCase):
+  def test_counts_set_bits(self):
+    self.assertEqual(popcount(0), 0)
+    self.assertEqual(popcount(0b1011), 3)
+    self.assertEqual(popcount(1 << 200 | 1), 2)
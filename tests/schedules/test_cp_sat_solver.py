@@ -0,0 +1,43 @@
+import unittest
+import pytest
+from schedules.application.schedule_search import ScheduleSearchProblem
+from schedules.application.search_budget import SearchBudget
+from schedules.application.top_schedules import TopSchedules
+from schedules.application.solver_backends import BacktrackingBackend
+from schedules.infrastructure.cp_sat_solver import CpSatBackend
+from tests.factories import build_course
+
+pytest.importorskip('ortools')
+
+class TestCpSatSolver(unittest.TestCase):
+  def setUp(self):
+    self.courses = [
+      build_course('5CM50', 'ALGORITMOS', 'MONDAY', 0.9),
+      build_course('5CM51', 'ALGORITMOS', 'TUESDAY', 0.3),
+      build_course('5CM50', 'BASES DE DATOS', 'MONDAY', 0.8),
+      build_course('5CM51', 'BASES DE DATOS', 'WEDNESDAY', 0.6),
+      build_course('5CM50', 'REDES', 'THURSDAY', 0.4),
+      build_course('5CM50', 'COMPILADORES', 'FRIDAY', 0.7),
+    ]
+    self.problem = ScheduleSearchProblem(self.courses, {'REDES'}, n=3, credits=100)
+
+  def solve(self, backend, budget):
+    best_schedules = TopSchedules(5)
+    backend.solve(self.problem, budget, best_schedules)
+    return [round(candidate.score, 6) for candidate in best_schedules.ranked()]
+
+  def test_matches_backtracking(self):
+    budget = SearchBudget(time_budget_ms=10000)
+    
+    scores = self.solve(CpSatBackend(), budget)
+    
+    self.assertFalse(budget.truncated)
+    self.assertEqual(scores, self.solve(BacktrackingBackend(), SearchBudget()))
+
+  def test_node_budget_truncates(self):
+    budget = SearchBudget(max_nodes=1)
+    
+    scores = self.solve(CpSatBackend(), budget)
+    
+    self.assertTrue(budget.truncated)
+    self.assertEqual(scores, self.solve(BacktrackingBackend(), SearchBudget())[:1])
@@ -0,0 +1,40 @@
+import unittest
+from schedules.application.top_schedules import TopSchedules
+from schedules.application.ranked_schedules import RankedSchedules
+from tests.factories import build_course
+
+class TestRankedSchedules(unittest.TestCase):
+  def setUp(self):
+    # Dos secciones equivalentes de ALGORITMOS y una de REDES
+    self.course_classes = [
+      [build_course('5CM50', 'ALGORITMOS', score=0.8), build_course('5CM51', 'ALGORITMOS', score=0.8)],
+      [build_course('5CM50', 'REDES', score=0.4)],
+    ]
+    best_schedules = TopSchedules(10)
+    best_schedules.push(0.8, (0,), 6.0, count=2)
+    best_schedules.push(0.4, (1,), 6.0)
+    self.ranked = RankedSchedules(self.course_classes, best_schedules.ranked(), max_results=10, exhaustive=True, explored_nodes=5)
+
+  def test_size_counts_concrete_schedules(self):
+    self.assertEqual(len(self.ranked), 3)
+
+  def test_pages_follow_ranking(self):
+    first = self.ranked.page(0, 2)
+    second = self.ranked.page(2, 2)
+    
+    self.assertEqual([schedule.option for schedule in first + second], [0, 1, 2])
+    self.assertEqual([schedule.courses[0].sequence for schedule in first], ['5CM50', '5CM51'])
+    self.assertEqual(second[0].courses[0].subject, 'REDES')
+    self.assertEqual(second[0].avg_positive_score, 0.4)
+    self.assertEqual(self.ranked.page(3, 2), [])
+
+  def test_size_is_limited_by_max_results(self):
+    ranked = RankedSchedules(self.course_classes, self.ranked.candidates, max_results=1, exhaustive=True, explored_nodes=5)
+    
+    self.assertEqual(len(ranked), 1)
+    self.assertEqual(len(ranked.page(0, 20)), 1)
+
+  def test_schedules_reuse_course_instances(self):
+    schedule = self.ranked.page(0, 1)[0]
+    
+    self.assertIs(schedule.courses[0], self.course_classes[0][0])
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import unittest
+from schedules.application.result_cache import ScheduleResultCache
+
+class TestScheduleResultCache(unittest.TestCase):
+  def test_evicts_least_recently_used(self):
+    cache = ScheduleResultCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    
+    self.assertEqual(cache.get('a'), 1)
+    self.assertIsNone(cache.get('b'))
+    self.assertEqual(cache.get('c'), 3)
+
+  def test_expired_entries_are_discarded(self):
+    cache = ScheduleResultCache(ttl_seconds=0)
+    cache.put('a', 1)
+    
+    self.assertIsNone(cache.get('a'))
+
+  def test_new_data_version_clears_entries(self):
+    cache = ScheduleResultCache()
+    cache.sync_data_version(1)
+    cache.put('a', 1)
+    
+    cache.sync_data_version(1)
+    self.assertEqual(cache.get('a'), 1)
+    
+    cache.sync_data_version(2)
+    self.assertIsNone(cache.get('a'))
+
+  def test_concurrent_threads_do_not_corrupt_entries(self):
+    cache = ScheduleResultCache(max_entries=8)
+    errors = []
+    
+    def use_cache(worker):
+      try:
+        for i in range(2000):
+          cache.sync_data_version(i // 100)
+          cache.put((worker, i % 16), i)
+          cache.get((worker, (i + 1) % 16))
+      except Exception as e:
+        errors.append(e)
+    
+    threads = [threading.Thread(target=use_cache, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    
+    self.assertEqual(errors, [])
+    self.assertLessEqual(len(cache.entries), 8)
+
+  def test_concurrent_identical_requests_compute_once(self):
+    cache = ScheduleResultCache()
+    calls = []
+    
+    async def compute():
+      calls.append(1)
+      await asyncio.sleep(0.01)
+      return 'horarios'
+    
+    async def scenario():
+      return await asyncio.gather(*[cache.get_or_compute('llave', compute) for _ in range(5)])
+    
+    results = asyncio.run(scenario())
+    
+    self.assertEqual(results, ['horarios'] * 5)
+    self.assertEqual(len(calls), 1)
+    self.assertEqual(cache.get('llave'), 'horarios')
+
+  def test_failed_computations_are_not_cached(self):
+    cache = ScheduleResultCache()
+    
+    async def compute():
+      raise RuntimeError('falla')
+    
+    with self.assertRaises(RuntimeError):
+      asyncio.run(cache.get_or_compute('llave', compute))
+    self.assertIsNone(cache.get('llave'))
+    self.assertEqual(cache.in_flight, {})
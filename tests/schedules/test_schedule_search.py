@@ -0,0 +1,122 @@
+import unittest
+from schedules.application.search_budget import SearchBudget
+from schedules.application.schedule_search import ScheduleSearchProblem, backtrack_schedules, count_schedules
+from tests.factories import build_course
+
+class TestScheduleSearchProblem(unittest.TestCase):
+  def setUp(self):
+    self.courses = [
+      build_course('5CM50', 'ALGORITMOS', 'MONDAY', 0.9),
+      build_course('5CM51', 'ALGORITMOS', 'TUESDAY', 0.3),
+      build_course('5CM50', 'BASES DE DATOS', 'MONDAY', 0.8),
+      build_course('5CM51', 'BASES DE DATOS', 'WEDNESDAY', 0.6),
+      build_course('5CM50', 'REDES', 'THURSDAY', 0.4),
+      build_course('5CM50', 'COMPILADORES', 'MONDAY', 0.7, start_time='08:00', end_time='09:00'),
+    ]
+
+  def leaves(self, problem, start=None):
+    budget = SearchBudget()
+    leaves = backtrack_schedules(problem, budget) if start is None else backtrack_schedules(problem, budget, start=start)
+    return sorted(tuple(sorted(leaf.course_indices)) for leaf in leaves)
+
+  def test_leaves_are_conflict_free(self):
+    problem = ScheduleSearchProblem(self.courses, set(), n=2, credits=100)
+    
+    leaves = self.leaves(problem)
+    
+    self.assertIn((1, 2), leaves)
+    self.assertNotIn((0, 2), leaves)
+    self.assertNotIn((0, 1), leaves)
+    self.assertNotIn((0, 5), leaves)
+
+  def test_required_subjects_missing_make_problem_infeasible(self):
+    problem = ScheduleSearchProblem(self.courses, {'INTELIGENCIA ARTIFICIAL'}, n=2, credits=100)
+    
+    self.assertFalse(problem.feasible)
+    self.assertEqual(self.leaves(problem), [])
+
+  def test_estimated_size_ignores_conflicts(self):
+    problem = ScheduleSearchProblem(self.courses, set(), n=2, credits=100)
+    
+    # Secciones por asignatura: 2, 2, 1, 1
+    self.assertEqual(problem.estimated_size(), 2*2 + 2*1 + 2*1 + 2*1 + 2*1 + 1*1)
+
+  def test_estimated_schedules_discounts_conflict_density(self):
+    problem = ScheduleSearchProblem(self.courses, set(), n=2, credits=100)
+    
+    # 3 de los 13 pares de secciones de asignaturas distintas se traslapan
+    self.assertAlmostEqual(problem.conflict_density, 3 / 13)
+    self.assertAlmostEqual(problem.estimated_schedules(), 10)
+    self.assertEqual(len(self.leaves(problem)), 10)
+
+  def test_select_subject_prefers_fewest_compatible_sections(self):
+    problem = ScheduleSearchProblem(self.courses, set(), n=2, credits=100)
+    redes = problem.subject_sections.index([4])
+    compiladores = problem.subject_sections.index([5])
+    live, domains = problem.domains(problem.root().remaining, 0)
+    
+    # REDES y COMPILADORES tienen una sola sección; COMPILADORES choca con más cursos
+    self.assertEqual(problem.select_subject(live, domains), compiladores)
+    self.assertEqual(problem.select_subject(live & ~(1 << compiladores), domains), redes)
+
+  def test_domains_drop_optional_subjects_without_sections(self):
+    problem = ScheduleSearchProblem(self.courses, set(), n=2, credits=100)
+    compiladores = problem.subject_sections.index([5])
+    
+    live, domains = problem.domains(problem.root().remaining, 1 << 5)
+    
+    self.assertEqual(domains[compiladores], 0)
+    self.assertFalse((live >> compiladores) & 1)
+
+  def test_domains_detect_required_subject_wipe_out(self):
+    problem = ScheduleSearchProblem(self.courses, {'COMPILADORES'}, n=2, credits=100)
+    
+    self.assertIsNone(problem.domains(problem.root().remaining, 1 << 5))
+
+  def test_forward_checking_prunes_dead_ends(self):
+    # Elegir ALGORITMOS el lunes deja sin secciones a COMPILADORES, que es requerida
+    problem = ScheduleSearchProblem(self.courses, {'ALGORITMOS', 'COMPILADORES'}, n=2, credits=100)
+    budget = SearchBudget()
+    
+    leaves = sorted(tuple(sorted(leaf.course_indices)) for leaf in backtrack_schedules(problem, budget))
+    
+    self.assertEqual(leaves, [(1, 5)])
+    # Raíz, la única sección de COMPILADORES y la hoja con ALGORITMOS del martes
+    self.assertEqual(budget.explored_nodes, 3)
+
+  def test_required_subjects_are_decided_first(self):
+    problem = ScheduleSearchProblem(self.courses, {'ALGORITMOS'}, n=2, credits=100)
+    live, domains = problem.domains(problem.root().remaining, 0)
+    
+    subject = problem.select_subject(live, domains)
+    
+    self.assertEqual(problem.subject_sections[subject], [0, 1])
+    self.assertTrue(all(0 in leaf or 1 in leaf for leaf in self.leaves(problem)))
+
+  def test_split_subtrees_cover_all_leaves(self):
+    problem = ScheduleSearchProblem(self.courses, {'REDES'}, n=3, credits=100)
+    
+    subtrees = problem.split(5)
+    
+    self.assertGreaterEqual(len(subtrees), 5)
+    split_leaves = sorted(leaf for start in subtrees for leaf in self.leaves(problem, start))
+    self.assertEqual(split_leaves, self.leaves(problem))
+
+  def test_interchangeable_sections_are_collapsed(self):
+    twin = build_course('5CM52', 'ALGORITMOS', 'MONDAY', 0.9)
+    problem = ScheduleSearchProblem(self.courses + [twin], set(), n=2, credits=100)
+    
+    self.assertEqual(len(problem.courses), len(self.courses))
+    self.assertEqual(problem.multiplicity((0, 4)), 2)
+    sequences = [[course.sequence for course in schedule] for schedule in problem.concrete_schedules((0, 4))]
+    self.assertEqual(sequences, [['5CM50', '5CM50'], ['5CM52', '5CM50']])
+
+  def test_count_stops_when_the_memo_is_full(self):
+    problem = ScheduleSearchProblem(self.courses, set(), n=3, credits=100)
+    total = count_schedules(problem, SearchBudget())
+    budget = SearchBudget()
+    
+    count = count_schedules(problem, budget, max_memo_entries=2)
+    
+    self.assertTrue(budget.truncated)
+    self.assertLess(count, total)
@@ -1,9 +1,11 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from courses.domain.model.course import Course
 from courses.domain.ports.courses_repository import CourseRepository
 from courses.application.course import CourseService
 from schedules.application.schedule import ScheduleService
+from schedules.application.schedule_query import ScheduleQuery
+from schedules.domain.ports.solver_backend import SearchTooLargeError
 
 class TestScheduleService(unittest.TestCase):
   def setUp(self):
@@ -208,7 +210,7 @@ class TestScheduleService(unittest.TestCase):
 
     schedule_service = ScheduleService(self.course_service)
     
-    result = schedule_service.generate_schedules(
+    result = schedule_service.generate_schedules(ScheduleQuery(
           levels=['5'],
           career='C',
           extra_subjects = [],
@@ -222,7 +224,7 @@ class TestScheduleService(unittest.TestCase):
           n=2,
           credits=20,
           max_results= 20
-        );
+        ));
     
     for schedule in result:
       self.assertEqual(len(schedule.courses), 2);
@@ -234,4 +236,348 @@ class TestScheduleService(unittest.TestCase):
         
         self.assertEqual(course.career, 'C')
 
-      
\ No newline at end of file
+  def test_overlapping_courses_are_not_combined(self):
+    self.course_service.filter_coruses.return_value = self.courses
+
+    schedule_service = ScheduleService(self.course_service)
+    
+    result = schedule_service.generate_schedules(ScheduleQuery(
+          levels=['5'],
+          career='C',
+          extra_subjects = [],
+          required_subjects = [],
+          semesters=['5'],
+          start_time='07:00',
+          end_time='22:00',
+          excluded_teachers=[],
+          excluded_subjects=[],
+          min_course_availability=[],
+          n=2,
+          credits=40,
+          max_results= 100
+        ))
+    
+    self.assertGreater(len(result), 0)
+    for schedule in result:
+      sequences = {course.sequence for course in schedule.courses}
+      # INTELIGENCIA ARTIFICIAL (lunes 10-12) se traslapa con INTRODUCCIÓN A LA PROGRAMACIÓN (lunes 11-13)
+      self.assertFalse({'7CM70', '1CM10'} <= sequences)
+      self.assertEqual(len({course.subject for course in schedule.courses}), 2)
+
+  def test_no_schedules_when_subjects_are_not_enough(self):
+    # Solo existen 9 asignaturas distintas entre los 10 cursos
+    self.course_service.filter_coruses.return_value = self.courses
+
+    schedule_service = ScheduleService(self.course_service)
+    
+    result = schedule_service.generate_schedules(ScheduleQuery(
+          levels=['5'],
+          career='C',
+          extra_subjects = [],
+          required_subjects = [],
+          semesters=['5'],
+          start_time='07:00',
+          end_time='22:00',
+          excluded_teachers=[],
+          excluded_subjects=[],
+          min_course_availability=[],
+          n=10,
+          credits=200,
+          max_results= 20
+        ))
+    
+    self.assertEqual(result, [])
+
+  def test_schedules_are_ranked_and_limited(self):
+    self.course_service.filter_coruses.return_value = self.courses
+
+    schedule_service = ScheduleService(self.course_service)
+    
+    result = schedule_service.generate_schedules(ScheduleQuery(
+          levels=['5'],
+          career='C',
+          extra_subjects = [],
+          required_subjects = [],
+          semesters=['5'],
+          start_time='07:00',
+          end_time='22:00',
+          excluded_teachers=[],
+          excluded_subjects=[],
+          min_course_availability=[],
+          n=3,
+          credits=40,
+          max_results= 5
+        ))
+    
+    self.assertEqual(len(result), 5)
+    self.assertEqual([schedule.option for schedule in result], [0, 1, 2, 3, 4])
+    scores = [schedule.avg_positive_score for schedule in result]
+    self.assertEqual(scores, sorted(scores, reverse=True))
+
+  def test_schedules_respect_credit_budget(self):
+    self.course_service.filter_coruses.return_value = self.courses
+
+    schedule_service = ScheduleService(self.course_service)
+    
+    generate = lambda credits: schedule_service.generate_schedules(ScheduleQuery(
+          levels=['5'],
+          career='C',
+          extra_subjects = [],
+          required_subjects = [],
+          semesters=['5'],
+          start_time='07:00',
+          end_time='22:00',
+          excluded_teachers=[],
+          excluded_subjects=[],
+          min_course_availability=[],
+          n=3,
+          credits=credits,
+          max_results= 20
+        ))
+    
+    self.assertEqual(generate(11), [])
+    
+    result = generate(12)
+    self.assertEqual(len(result), 1)
+    self.assertEqual(result[0].total_credits_required, 12)
+    self.assertEqual({course.sequence for course in result[0].courses}, {'1CM10', '2CV20', '3CM30'})
+
+  def test_required_subjects_appear_in_every_schedule(self):
+    self.course_service.filter_coruses.return_value = self.courses
+
+    schedule_service = ScheduleService(self.course_service)
+    
+    generate = lambda required_subjects: schedule_service.generate_schedules(ScheduleQuery(
+          levels=['5'],
+          career='C',
+          extra_subjects = [],
+          required_subjects = required_subjects,
+          semesters=['5'],
+          start_time='07:00',
+          end_time='22:00',
+          excluded_teachers=[],
+          excluded_subjects=[],
+          min_course_availability=[],
+          n=3,
+          credits=40,
+          max_results= 20
+        ))
+    
+    result = generate([('5CM50', 'SISTEMAS OPERATIVOS'), ('5CM50', 'ALGORITMOS')])
+    self.assertGreater(len(result), 0)
+    for schedule in result:
+      subjects = {course.subject for course in schedule.courses}
+      self.assertIn('SISTEMAS OPERATIVOS', subjects)
+      self.assertIn('ALGORITMOS', subjects)
+    
+    self.assertEqual(generate([('5CM50', 'COMPILADORES')]), [])
+
+  def test_search_reports_truncation_by_node_budget(self):
+    self.course_service.filter_coruses.return_value = self.courses
+
+    schedule_service = ScheduleService(self.course_service)
+    
+    search = lambda max_nodes: schedule_service.search_schedules(ScheduleQuery(
+          levels=['5'],
+          career='C',
+          extra_subjects = [],
+          required_subjects = [],
+          semesters=['5'],
+          start_time='07:00',
+          end_time='22:00',
+          excluded_teachers=[],
+          excluded_subjects=[],
+          min_course_availability=[],
+          n=3,
+          credits=40,
+          max_results= 20,
+          max_nodes=max_nodes
+        ))
+    
+    complete = search(None)
+    self.assertTrue(complete.exhaustive)
+    
+    truncated = search(10)
+    self.assertFalse(truncated.exhaustive)
+    self.assertEqual(truncated.explored_nodes, 10)
+    self.assertLessEqual(len(truncated.schedules), len(complete.schedules))
+
+  def test_iter_schedules_yields_every_valid_schedule(self):
+    self.course_service.filter_coruses.return_value = self.courses
+
+    schedule_service = ScheduleService(self.course_service)
+    
+    params = dict(
+          levels=['5'],
+          career='C',
+          extra_subjects = [],
+          required_subjects = [],
+          semesters=['5'],
+          start_time='07:00',
+          end_time='22:00',
+          excluded_teachers=[],
+          excluded_subjects=[],
+          min_course_availability=[],
+          n=3,
+          credits=40
+        )
+    
+    streamed = list(schedule_service.iter_schedules(ScheduleQuery(**params, max_results=None)))
+    ranked = schedule_service.generate_schedules(ScheduleQuery(**params, max_results=1000))
+    
+    self.assertEqual(len(streamed), len(ranked))
+    self.assertEqual(
+      sorted(schedule.avg_positive_score for schedule in streamed),
+      sorted(schedule.avg_positive_score for schedule in ranked)
+    )
+    self.assertEqual(len(list(schedule_service.iter_schedules(ScheduleQuery(**params, max_results=3)))), 3)
+
+  def test_parallel_search_matches_sequential_search(self):
+    self.course_service.filter_coruses.return_value = self.courses
+
+    params = dict(
+          levels=['5'],
+          career='C',
+          extra_subjects = [],
+          required_subjects = [],
+          semesters=['5'],
+          start_time='07:00',
+          end_time='22:00',
+          excluded_teachers=[],
+          excluded_subjects=[],
+          min_course_availability=[],
+          n=3,
+          credits=40,
+          max_results=10
+        )
+    
+    sequential = ScheduleService(self.course_service).search_schedules(ScheduleQuery(**params))
+    # Con una búsqueda previa tan corta el árbol se reparte entre los procesos
+    with patch('schedules.application.parallel_search.PARALLEL_SEARCH_PROBE_NODES', 10):
+      parallel = ScheduleService(self.course_service, parallel_threshold=0).search_schedules(ScheduleQuery(**params))
+    
+    self.assertTrue(parallel.exhaustive)
+    self.assertEqual(
+      [schedule.avg_positive_score for schedule in parallel.schedules],
+      [schedule.avg_positive_score for schedule in sequential.schedules]
+    )
+    self.assertEqual([schedule.option for schedule in parallel.schedules], list(range(10)))
+
+  def test_count_schedules_matches_generated_schedules(self):
+    self.course_service.filter_coruses.return_value = self.courses
+
+    schedule_service = ScheduleService(self.course_service)
+    
+    params = dict(
+          levels=['5'],
+          career='C',
+          extra_subjects = [],
+          required_subjects = [],
+          semesters=['5'],
+          start_time='07:00',
+          end_time='22:00',
+          excluded_teachers=[],
+          excluded_subjects=[],
+          min_course_availability=[],
+          n=3,
+          credits=40
+        )
+    
+    result = schedule_service.count_schedules(ScheduleQuery(**params))
+    
+    self.assertTrue(result.exhaustive)
+    self.assertEqual(result.count, len(list(schedule_service.iter_schedules(ScheduleQuery(**params, max_results=None)))))
+    
+    truncated = schedule_service.count_schedules(ScheduleQuery(**params, max_nodes=1))
+    self.assertFalse(truncated.exhaustive)
+    self.assertLessEqual(truncated.count, result.count)
+
+  def test_batch_fetches_courses_once_per_universe(self):
+    self.course_service.filter_coruses.return_value = self.courses
+
+    schedule_service = ScheduleService(self.course_service)
+    
+    params = dict(
+          levels=['5'],
+          career='C',
+          extra_subjects = [],
+          required_subjects = [],
+          semesters=['5'],
+          start_time='07:00',
+          end_time='22:00',
+          excluded_teachers=[],
+          excluded_subjects=[],
+          min_course_availability=1,
+          n=3,
+          credits=40,
+          max_results=10
+        )
+    searches = [ScheduleQuery(**params), ScheduleQuery(**dict(params, n=2)), ScheduleQuery(**dict(params, career='A'))]
+    
+    results = schedule_service.rank_schedules_batch(searches)
+    
+    self.assertEqual(self.course_service.get_courses.call_count, 2)
+    self.assertEqual(len(results), 3)
+    for search, ranked in zip(searches, results):
+      expected = schedule_service.search_schedules(search)
+      self.assertTrue(ranked.exhaustive)
+      self.assertEqual(
+        [schedule.avg_positive_score for schedule in ranked.page(0, 10)],
+        [schedule.avg_positive_score for schedule in expected.schedules]
+      )
+
+  def test_batch_returns_errors_in_place(self):
+    self.course_service.filter_coruses.return_value = self.courses
+
+    schedule_service = ScheduleService(self.course_service)
+    
+    query = ScheduleQuery(
+          levels=['5'],
+          career='C',
+          extra_subjects = [],
+          required_subjects = [],
+          semesters=['5'],
+          start_time='07:00',
+          end_time='22:00',
+          excluded_teachers=[],
+          excluded_subjects=[],
+          min_course_availability=1,
+          n=3,
+          credits=40,
+          max_results=10
+        )
+    
+    unknown, ranked = schedule_service.rank_schedules_batch([query._replace(engine='simplex'), query])
+    
+    self.assertIsInstance(unknown, ValueError)
+    self.assertTrue(ranked.exhaustive)
+    self.assertEqual(len(ranked), 10)
+
+  def test_every_search_applies_admission_control(self):
+    self.course_service.filter_coruses.return_value = self.courses
+
+    schedule_service = ScheduleService(self.course_service, reject_threshold=0)
+    
+    query = ScheduleQuery(
+          levels=['5'],
+          career='C',
+          extra_subjects = [],
+          required_subjects = [],
+          semesters=['5'],
+          start_time='07:00',
+          end_time='22:00',
+          excluded_teachers=[],
+          excluded_subjects=[],
+          min_course_availability=1,
+          n=3,
+          credits=40
+        )
+    
+    with self.assertRaises(SearchTooLargeError):
+      schedule_service.rank_schedules(query)
+    with self.assertRaises(SearchTooLargeError):
+      schedule_service.count_schedules(query)
+    with self.assertRaises(SearchTooLargeError):
+      next(schedule_service.iter_schedules(query))
+    rejected, = schedule_service.rank_schedules_batch([query])
+    self.assertIsInstance(rejected, SearchTooLargeError)
@@ -0,0 +1,42 @@
+import time
+import unittest
+from schedules.application.search_budget import SearchBudget
+
+class TestSearchBudget(unittest.TestCase):
+  def test_unbounded_budget_never_truncates(self):
+    budget = SearchBudget()
+    
+    for _ in range(1000):
+      self.assertTrue(budget.spend())
+    
+    self.assertFalse(budget.truncated)
+    self.assertEqual(budget.explored_nodes, 1000)
+
+  def test_node_budget_truncates(self):
+    budget = SearchBudget(max_nodes=3)
+    
+    self.assertEqual([budget.spend() for _ in range(5)], [True, True, True, False, False])
+    self.assertTrue(budget.truncated)
+
+  def test_expired_time_budget_truncates(self):
+    budget = SearchBudget(time_budget_ms=1)
+    budget.deadline = 0
+    
+    results = [budget.spend() for _ in range(300)]
+    
+    self.assertFalse(all(results))
+    self.assertTrue(budget.truncated)
+
+  def test_wall_deadline_in_the_past_truncates(self):
+    budget = SearchBudget(wall_deadline=time.time() - 1)
+    
+    results = [budget.spend() for _ in range(300)]
+    
+    self.assertFalse(all(results))
+    self.assertTrue(budget.truncated)
+
+  def test_wall_deadline_is_shared_with_the_earliest_limit(self):
+    budget = SearchBudget(time_budget_ms=60000, wall_deadline=time.time() + 1)
+    
+    self.assertAlmostEqual(budget.wall_deadline(), time.time() + 1, delta=0.1)
+    self.assertIsNone(SearchBudget(max_nodes=10).wall_deadline())
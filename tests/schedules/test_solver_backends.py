@@ -0,0 +1,114 @@
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+from courses.application.course import CourseService
+from schedules.application.schedule import ScheduleService
+from schedules.application.schedule_query import ScheduleQuery
+from schedules.application.compiled_universe import CompiledUniverse
+from schedules.application.schedule_search import ScheduleSearchProblem
+from schedules.application.search_budget import SearchBudget
+from schedules.application.top_schedules import TopSchedules
+from schedules.application.solver_backends import BacktrackingBackend, BeamSearchBackend
+from schedules.domain.ports.solver_backend import SolverBackend, SolverUnavailableError, SearchTooLargeError
+from schedules.infrastructure.cp_sat_solver import CpSatBackend
+from tests.factories import build_course
+
+# Sin OR-Tools instalado: cualquier import de ortools falla
+WITHOUT_ORTOOLS = {'ortools': None, 'ortools.sat': None, 'ortools.sat.python': None}
+
+class FakeCpSatBackend(SolverBackend):
+  name = 'cp_sat'
+
+  def __init__(self, installed):
+    self.installed = installed
+    self.solved = False
+
+  def available(self):
+    return self.installed
+
+  def solve(self, problem, budget, best_schedules):
+    self.solved = True
+
+class TestSolverBackends(unittest.TestCase):
+  def setUp(self):
+    self.courses = [
+      build_course('5CM50', 'ALGORITMOS', 'MONDAY', 0.9),
+      build_course('5CM51', 'ALGORITMOS', 'TUESDAY', 0.3),
+      build_course('5CM50', 'BASES DE DATOS', 'MONDAY', 0.8),
+      build_course('5CM51', 'BASES DE DATOS', 'WEDNESDAY', 0.6),
+      build_course('5CM50', 'REDES', 'THURSDAY', 0.4),
+    ]
+    self.problem = ScheduleSearchProblem(self.courses, set(), n=2, credits=100)
+    self.schedule_service = ScheduleService(MagicMock(spec=CourseService))
+
+  def solve(self, backend, budget=None):
+    best_schedules = TopSchedules(10)
+    backend.solve(self.problem, budget or SearchBudget(), best_schedules)
+    return [round(candidate.score, 9) for candidate in best_schedules.ranked()]
+
+  def test_wide_beam_matches_exact_search(self):
+    budget = SearchBudget()
+    
+    self.assertEqual(self.solve(BeamSearchBackend(), budget), self.solve(BacktrackingBackend()))
+    self.assertFalse(budget.truncated)
+
+  def test_narrow_beam_is_reported_as_truncated(self):
+    budget = SearchBudget()
+    
+    scores = self.solve(BeamSearchBackend(beam_width=1), budget)
+    
+    self.assertTrue(budget.truncated)
+    self.assertEqual(len(scores), 1)
+    self.assertIn(scores[0], self.solve(BacktrackingBackend()))
+
+  def test_exhausted_beam_completes_its_partial_schedules(self):
+    budget = SearchBudget(max_nodes=3)
+    
+    scores = self.solve(BeamSearchBackend(), budget)
+    
+    self.assertTrue(budget.truncated)
+    self.assertTrue(scores)
+    self.assertLessEqual(set(scores), set(self.solve(BacktrackingBackend())))
+
+  def test_engines_are_selected_by_name(self):
+    self.assertIsInstance(self.schedule_service._select_backend(self.problem, 'backtracking'), BacktrackingBackend)
+    self.assertIsInstance(self.schedule_service._select_backend(self.problem, 'auto'), BacktrackingBackend)
+    with self.assertRaises(ValueError):
+      self.schedule_service._select_backend(self.problem, 'simplex')
+
+  def test_auto_prefers_cp_sat_for_large_searches_only_when_available(self):
+    for installed in (True, False):
+      cp_sat = FakeCpSatBackend(installed)
+      schedule_service = ScheduleService(MagicMock(spec=CourseService), backends=[cp_sat], cp_sat_threshold=0)
+      
+      selected = schedule_service._select_backend(self.problem, 'auto')
+      
+      self.assertIs(selected is cp_sat, installed)
+
+  def test_cp_sat_without_ortools_is_unavailable(self):
+    with patch.dict(sys.modules, WITHOUT_ORTOOLS):
+      with self.assertRaises(SolverUnavailableError):
+        self.solve(CpSatBackend())
+
+  def test_admission_control_uses_estimated_schedules(self):
+    approximate = ScheduleService(MagicMock(spec=CourseService), approximate_threshold=0)
+    rejecting = ScheduleService(MagicMock(spec=CourseService), reject_threshold=0)
+    query = ScheduleQuery(
+      levels=['5'],
+      career='C',
+      extra_subjects=[],
+      required_subjects=[],
+      semesters=['5'],
+      start_time=None,
+      end_time=None,
+      excluded_teachers=[],
+      excluded_subjects=[],
+      min_course_availability=0,
+      n=2,
+      credits=100
+    )
+    
+    self.assertIsInstance(approximate._select_backend(self.problem, 'auto'), BeamSearchBackend)
+    self.assertIsInstance(approximate._select_backend(self.problem, 'backtracking'), BacktrackingBackend)
+    with self.assertRaises(SearchTooLargeError):
+      rejecting._build_problem(query, CompiledUniverse(self.courses), self.courses)
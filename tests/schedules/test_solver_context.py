@@ -0,0 +1,104 @@
+import unittest
+from unittest.mock import MagicMock
+from courses.domain.ports.courses_repository import CourseRepository
+from courses.application.course import CourseService
+from schedules.application.schedule import ScheduleService
+from schedules.application.schedule_query import ScheduleQuery
+from schedules.application.result_cache import ScheduleResultCache
+from tests.factories import build_course
+
+class TestSolverContext(unittest.TestCase):
+  def setUp(self):
+    self.courses = [
+      build_course('5CM50', 'ALGORITMOS', 'MONDAY', 0.9),
+      build_course('5CM51', 'ALGORITMOS', 'TUESDAY', 0.3, availability=5),
+      build_course('5CM50', 'BASES DE DATOS', 'MONDAY', 0.8, teacher='GARCÍA LÓPEZ CARLOS'),
+      build_course('5CM51', 'BASES DE DATOS', 'WEDNESDAY', 0.6),
+      build_course('5CM50', 'REDES', 'THURSDAY', 0.4),
+      build_course('5CM50', 'COMPILADORES', 'FRIDAY', 0.7, availability=5),
+    ]
+    self.repository = MagicMock(spec=CourseRepository)
+    self.repository.get_courses.return_value = self.courses
+    self.schedule_service = ScheduleService(CourseService(self.repository))
+    self.query = ScheduleQuery(
+      levels=['5'],
+      career='C',
+      extra_subjects=[],
+      required_subjects=[],
+      semesters=['5'],
+      start_time='07:00',
+      end_time='22:00',
+      excluded_teachers=[],
+      excluded_subjects=[],
+      min_course_availability=1,
+      n=2,
+      credits=40,
+      max_results=20
+    )
+
+  def scores(self, ranked):
+    return [round(schedule.avg_positive_score, 9) for schedule in ranked.page(0, len(ranked))]
+
+  def test_tightened_search_reuses_previous_result(self):
+    previous = self.schedule_service.refine_schedules(None, self.query)
+    tightened = self.query._replace(min_course_availability=10)
+    
+    context = self.schedule_service.refine_schedules(previous, tightened)
+    
+    self.assertEqual(self.repository.get_courses.call_count, 1)
+    # La búsqueda anterior fue exhaustiva y no llenó el límite: no se vuelve a buscar
+    self.assertEqual(context.ranked.explored_nodes, 0)
+    self.assertTrue(context.ranked.exhaustive)
+    self.assertEqual(self.scores(context.ranked), self.scores(self.schedule_service.rank_schedules(tightened)))
+
+  def test_tightened_search_seeds_survivors_when_previous_was_full(self):
+    query = self.query._replace(max_results=3)
+    previous = self.schedule_service.refine_schedules(None, query)
+    tightened = query._replace(excluded_teachers=['GARCÍA LÓPEZ CARLOS'])
+    
+    context = self.schedule_service.refine_schedules(previous, tightened)
+    
+    self.assertGreater(context.ranked.explored_nodes, 0)
+    self.assertEqual(self.scores(context.ranked), self.scores(self.schedule_service.rank_schedules(tightened)))
+
+  def test_shorter_ranking_reuses_previous_result(self):
+    previous = self.schedule_service.refine_schedules(None, self.query)
+    shorter = self.query._replace(max_results=2)
+    
+    context = self.schedule_service.refine_schedules(previous, shorter)
+    
+    self.assertEqual(context.ranked.explored_nodes, 0)
+    self.assertEqual(self.scores(context.ranked), self.scores(self.schedule_service.rank_schedules(shorter)))
+
+  def test_loosened_search_runs_from_scratch(self):
+    previous = self.schedule_service.refine_schedules(None, self.query._replace(min_course_availability=10))
+    
+    context = self.schedule_service.refine_schedules(previous, self.query)
+    
+    self.assertGreater(context.ranked.explored_nodes, 0)
+    self.assertEqual(self.scores(context.ranked), self.scores(self.schedule_service.rank_schedules(self.query)))
+
+  def test_different_universe_fetches_courses_again(self):
+    previous = self.schedule_service.refine_schedules(None, self.query)
+    
+    self.schedule_service.refine_schedules(previous, self.query._replace(semesters=['4', '5']))
+    
+    self.assertEqual(self.repository.get_courses.call_count, 2)
+
+  def test_universe_fetched_during_an_upload_is_not_reused(self):
+    cache = ScheduleResultCache()
+    schedule_service = ScheduleService(CourseService(self.repository), universe_cache=cache)
+    self.repository.get_data_version.return_value = 1
+    
+    def upload_while_fetching(*args, **kwargs):
+      # Otra petición ya vio la nueva versión mientras esta consultaba los cursos
+      self.repository.get_data_version.return_value = 2
+      cache.sync_data_version(2)
+      return self.courses
+    
+    self.repository.get_courses.side_effect = upload_while_fetching
+    schedule_service.rank_schedules(self.query)
+    self.repository.get_courses.side_effect = None
+    schedule_service.rank_schedules(self.query)
+    
+    self.assertEqual(self.repository.get_courses.call_count, 2)
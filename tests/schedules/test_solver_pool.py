@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import unittest
+from schedules.application.solver_pool import SolverPool, SolverQueueFullError
+
+class TestSolverPool(unittest.TestCase):
+  def test_runs_function_and_reports_wait(self):
+    pool = SolverPool(max_workers=1, max_queue=4)
+    
+    solver_run = asyncio.run(pool.run(lambda a, b: a + b, 2, b=3))
+    
+    self.assertEqual(solver_run.value, 5)
+    self.assertGreaterEqual(solver_run.wait_ms, 0)
+    self.assertEqual(pool.stats()['completed'], 1)
+
+  def test_submit_returns_a_future(self):
+    pool = SolverPool(max_workers=1, max_queue=4)
+    
+    solver_run = pool.submit(lambda a: a * 2, 21).result(5)
+    
+    self.assertEqual(solver_run.value, 42)
+    self.assertEqual(pool.stats()['completed'], 1)
+
+  def test_rejects_when_queue_is_full(self):
+    pool = SolverPool(max_workers=1, max_queue=1)
+    release = threading.Event()
+    started = threading.Event()
+    
+    def blocking_job():
+      started.set()
+      release.wait(5)
+      return 'ok'
+    
+    async def scenario():
+      running = asyncio.ensure_future(pool.run(blocking_job))
+      await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+      waiting = asyncio.ensure_future(pool.run(lambda: 'waiting'))
+      await asyncio.sleep(0)
+      
+      with self.assertRaises(SolverQueueFullError):
+        await pool.run(lambda: 'rejected')
+      
+      self.assertEqual(pool.stats()['queued'], 1)
+      self.assertEqual(pool.stats()['running'], 1)
+      release.set()
+      return await running, await waiting
+    
+    first, second = asyncio.run(scenario())
+    
+    self.assertEqual((first.value, second.value), ('ok', 'waiting'))
+    self.assertEqual(pool.stats()['rejected'], 1)
+    self.assertEqual(pool.stats()['completed'], 2)
@@ -0,0 +1,35 @@
+import unittest
+from schedules.application.time_slots import TimeSlotEncoder
+from tests.factories import build_course
+
+class TestTimeSlotEncoder(unittest.TestCase):
+  def setUp(self):
+    self.morning = build_course(subject='PROGRAMACIÓN WEB', schedule=[
+      {'day': 'MONDAY', 'start_time': '08:00', 'end_time': '10:00'}
+    ])
+    self.overlapping = build_course(subject='BASES DE DATOS', schedule=[
+      {'day': 'MONDAY', 'start_time': '09:30', 'end_time': '11:00'}
+    ])
+    self.contiguous = build_course(subject='ALGORITMOS', schedule=[
+      {'day': 'MONDAY', 'start_time': '10:00', 'end_time': '12:00'}
+    ])
+    self.other_day = build_course(subject='REDES DE COMPUTADORAS', schedule=[
+      {'day': 'TUESDAY', 'start_time': '08:00', 'end_time': '10:00'}
+    ])
+    self.courses = [self.morning, self.overlapping, self.contiguous, self.other_day]
+    self.encoder = TimeSlotEncoder(self.courses)
+
+  def test_overlapping_sessions_share_slots(self):
+    self.assertNotEqual(self.encoder.encode(self.morning) & self.encoder.encode(self.overlapping), 0)
+
+  def test_contiguous_sessions_do_not_share_slots(self):
+    self.assertEqual(self.encoder.encode(self.morning) & self.encoder.encode(self.contiguous), 0)
+
+  def test_same_hours_on_different_days_do_not_share_slots(self):
+    self.assertEqual(self.encoder.encode(self.morning) & self.encoder.encode(self.other_day), 0)
+
+  def test_encode_all_keeps_order(self):
+    masks = self.encoder.encode_all(self.courses)
+    
+    self.assertEqual(len(masks), 4)
+    self.assertEqual(masks[2], self.encoder.encode(self.contiguous))
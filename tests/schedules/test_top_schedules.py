@@ -0,0 +1,57 @@
+import unittest
+from schedules.application.top_schedules import TopSchedules
+
+class TestTopSchedules(unittest.TestCase):
+  def test_keeps_only_best_candidates(self):
+    top = TopSchedules(2)
+    top.push(0.5, (0,), 7)
+    top.push(0.9, (1,), 6)
+    top.push(0.1, (2,), 5)
+    top.push(0.7, (3,), 4)
+    
+    ranked = top.ranked()
+    self.assertEqual([candidate.course_indices for candidate in ranked], [(1,), (3,)])
+    self.assertTrue(top.is_full())
+
+  def test_ties_keep_first_found(self):
+    top = TopSchedules(2)
+    top.push(0.5, (0,), 7)
+    top.push(0.5, (1,), 7)
+    top.push(0.5, (2,), 7)
+    
+    self.assertEqual([candidate.course_indices for candidate in top.ranked()], [(0,), (1,)])
+
+  def test_zero_capacity_keeps_nothing(self):
+    top = TopSchedules(0)
+    top.push(0.5, (0,), 7)
+    
+    self.assertEqual(top.ranked(), [])
+
+  def test_cutoff_is_worst_kept_score_once_full(self):
+    top = TopSchedules(2)
+    self.assertEqual(top.cutoff(), float('-inf'))
+    
+    top.push(0.5, (0,), 7)
+    top.push(0.9, (1,), 6)
+    self.assertEqual(top.cutoff(), 0.5)
+
+  def test_candidates_count_their_equivalent_schedules(self):
+    top = TopSchedules(3)
+    top.push(0.9, (0,), 6, count=2)
+    top.push(0.5, (1,), 6)
+    self.assertTrue(top.is_full())
+    
+    # El de 0.5 se descarta porque el nuevo candidato y el de 0.9 cubren la capacidad
+    top.push(0.7, (2,), 6)
+    self.assertEqual([candidate.course_indices for candidate in top.ranked()], [(0,), (2,)])
+    self.assertEqual(top.cutoff(), 0.7)
+
+  def test_seeded_candidates_are_not_counted_twice(self):
+    top = TopSchedules(3)
+    top.seed(0.8, (2, 0), 12)
+    
+    self.assertEqual(top.cutoff(), -float('inf'))
+    top.push(0.8, (0, 2), 12)
+    top.push(0.5, (1,), 6)
+    
+    self.assertEqual([candidate.course_indices for candidate in top.ranked()], [(2, 0), (1,)])
@@ -0,0 +1,283 @@
+import sys
+import json
+
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+
+from main import app
+from routes.schedule import router as schedule_router, schedule_results_cache, solver_sessions, compiled_universes, solver_pool
+from courses.domain.ports.courses_repository import CourseRepository
+from schedules.application.schedule import ScheduleService
+from schedules.application.schedule_search import ScheduleSearchProblem
+from schedules.domain.ports.solver_backend import SearchTooLargeError
+from schedules.application.solver_pool import SolverQueueFullError
+from tests.factories import build_course
+
+client = TestClient(app)
+
+
+
+COURSES = [
+    build_course('5CM50', 'PROGRAMACIÓN WEB', 'MONDAY', 0.9),
+    build_course('5CM51', 'PROGRAMACIÓN WEB', 'TUESDAY', 0.4),
+    build_course('5CM50', 'BASES DE DATOS', 'MONDAY', 0.7, start_time='08:30', end_time='10:00'),
+    build_course('5CM51', 'BASES DE DATOS', 'MONDAY', 0.8),
+    build_course('5CM50', 'ALGORITMOS', 'WEDNESDAY', 0.6),
+    build_course('5CM50', 'REDES DE COMPUTADORAS', 'THURSDAY', 0.5),
+]
+
+REQUEST = {
+    'career': 'C',
+    'levels': ['5'],
+    'semesters': ['5'],
+    'start_time': '07:00',
+    'end_time': '22:00',
+    'length': 3,
+    'credits': 30,
+}
+
+
+class TestScheduleRoutes:
+    def setup_method(self):
+        schedule_router.courses = MagicMock(spec=CourseRepository)
+        schedule_router.courses.get_courses.return_value = COURSES
+        schedule_router.courses.get_data_version.return_value = 1
+        schedule_results_cache.entries.clear()
+        solver_sessions.entries.clear()
+        compiled_universes.entries.clear()
+
+    def test_generate_schedules_reports_exhaustive_search(self):
+        response = client.post('/schedules/', json=REQUEST)
+
+        assert response.status_code == 200
+        assert response.headers['X-Search-Exhaustive'] == 'true'
+        assert float(response.headers['X-Solver-Queue-Wait-Ms']) >= 0
+        schedules = response.json()
+        assert len(schedules) > 0
+        assert schedules[0]['avg_positive_score'] >= schedules[-1]['avg_positive_score']
+
+    def test_generate_schedules_reports_truncated_search(self):
+        response = client.post('/schedules/', json={**REQUEST, 'max_nodes': 2})
+
+        assert response.status_code == 200
+        assert response.headers['X-Search-Exhaustive'] == 'false'
+        assert response.headers['X-Search-Explored-Nodes'] == '2'
+
+    def test_stream_schedules_sends_one_schedule_per_line(self):
+        response = client.post('/schedules/stream', json=REQUEST)
+
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('application/x-ndjson')
+        lines = [line for line in response.text.split('\n') if line]
+        schedules = [json.loads(line) for line in lines]
+        assert len(schedules) > 0
+        assert [schedule['option'] for schedule in schedules] == list(range(len(schedules)))
+        for schedule in schedules:
+            assert len(schedule['courses']) == 3
+
+    def test_stream_schedules_runs_on_the_solver_pool(self):
+        completed = solver_pool.stats()['completed']
+
+        client.post('/schedules/stream', json=REQUEST)
+
+        assert solver_pool.stats()['completed'] == completed + 1
+
+    def test_stream_schedules_rejects_when_the_solver_pool_is_full(self):
+        with patch.object(solver_pool, 'submit', side_effect=SolverQueueFullError()):
+            response = client.post('/schedules/stream', json=REQUEST)
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '5'
+
+    def test_count_schedules_matches_generated_schedules(self):
+        response = client.post('/schedules/count', json=REQUEST)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body['exhaustive'] is True
+        streamed = [line for line in client.post('/schedules/stream', json=REQUEST).text.split('\n') if line]
+        assert body['count'] == len(streamed)
+
+    def test_engine_can_be_selected_per_request(self):
+        backtracking = client.post('/schedules/', json={**REQUEST, 'engine': 'backtracking'})
+        beam = client.post('/schedules/', json={**REQUEST, 'engine': 'beam'})
+
+        assert backtracking.status_code == 200
+        scores = lambda response: [round(schedule['avg_positive_score'], 9) for schedule in response.json()]
+        assert scores(beam) == scores(backtracking)
+
+    def test_unavailable_engine_is_reported(self):
+        with patch.dict(sys.modules, {'ortools': None, 'ortools.sat': None, 'ortools.sat.python': None}):
+            response = client.post('/schedules/', json={**REQUEST, 'engine': 'cp_sat'})
+
+        assert response.status_code == 501
+
+    def test_searches_too_large_are_rejected(self):
+        with patch('schedules.application.schedule_search.ScheduleSearchProblem.estimated_schedules', return_value=1e30):
+            response = client.post('/schedules/', json=REQUEST)
+
+        assert response.status_code == 422
+        assert 'Acota la petición' in response.json()['detail']
+
+    def test_session_refinement_reuses_previous_search(self):
+        first = client.post('/schedules/', json={**REQUEST, 'session_id': 'alumno-1'})
+        refined_request = {**REQUEST, 'excluded_teachers': ['PROFESOR 5CM51'], 'session_id': 'alumno-1'}
+        refined = client.post('/schedules/', json=refined_request)
+
+        assert first.status_code == 200
+        assert refined.status_code == 200
+        # Los cursos se consultan una sola vez para toda la sesión
+        assert schedule_router.courses.get_courses.call_count == 1
+
+        schedule_results_cache.entries.clear()
+        fresh = client.post('/schedules/', json={**refined_request, 'session_id': None})
+        assert refined.json() == fresh.json()
+
+    def test_session_is_recorded_when_served_from_cache(self):
+        client.post('/schedules/', json=REQUEST)
+        # La misma petición llega desde cache con una sesión nueva
+        cached = client.post('/schedules/', json={**REQUEST, 'session_id': 'alumno-2'})
+        refined = client.post('/schedules/', json={**REQUEST, 'excluded_teachers': ['PROFESOR 5CM51'], 'session_id': 'alumno-2'})
+
+        assert cached.status_code == 200
+        assert solver_sessions.get('alumno-2') is not None
+        # La sesión refina la búsqueda en cache sin volver a consultar los cursos ni buscar
+        assert refined.headers['X-Search-Explored-Nodes'] == '0'
+        assert schedule_router.courses.get_courses.call_count == 1
+
+    def test_batch_fetches_shared_courses_once(self):
+        requests = [REQUEST, {**REQUEST, 'length': 4}, {**REQUEST, 'excluded_teachers': ['PROFESOR 5CM51']}]
+        response = client.post('/schedules/batch', json={'requests': requests})
+
+        assert response.status_code == 200
+        assert schedule_router.courses.get_courses.call_count == 1
+        results = response.json()
+        assert len(results) == 3
+        for request, result in zip(requests, results):
+            assert result['exhaustive'] is True
+            assert result['schedules'] == client.post('/schedules/', json=request).json()
+
+    def test_batch_reports_errors_per_request(self):
+        select_backend = ScheduleService._select_backend
+
+        def reject_four_subjects(service, problem, engine):
+            if problem.n == 4:
+                raise SearchTooLargeError(1e20)
+            return select_backend(service, problem, engine)
+
+        with patch.object(ScheduleService, '_select_backend', reject_four_subjects):
+            response = client.post('/schedules/batch', json={'requests': [REQUEST, {**REQUEST, 'length': 4}]})
+
+        assert response.status_code == 200
+        accepted, rejected = response.json()
+        assert accepted['status_code'] == 200
+        assert accepted['schedules'] == client.post('/schedules/', json=REQUEST).json()
+        assert rejected['status_code'] == 422
+        assert rejected['schedules'] == []
+        assert 'demasiado grande' in rejected['error']
+
+    def test_count_and_stream_reject_searches_that_are_too_large(self):
+        with patch.object(ScheduleSearchProblem, 'estimated_schedules', return_value=1e30):
+            count = client.post('/schedules/count', json=REQUEST)
+            stream = client.post('/schedules/stream', json=REQUEST)
+
+        assert count.status_code == 422
+        assert stream.status_code == 422
+        assert 'demasiado grande' in stream.json()['detail']
+
+    def test_compiled_courses_are_shared_between_requests(self):
+        first = client.post('/schedules/', json=REQUEST)
+        filtered = client.post('/schedules/', json={**REQUEST, 'excluded_teachers': ['PROFESOR 5CM51']})
+        count = client.post('/schedules/count', json=REQUEST)
+
+        assert first.status_code == 200
+        assert filtered.status_code == 200
+        assert count.status_code == 200
+        assert schedule_router.courses.get_courses.call_count == 1
+        for schedule in filtered.json():
+            assert all(course['teacher'] != 'PROFESOR 5CM51' for course in schedule['courses'])
+
+    def test_cursor_returns_following_pages(self):
+        days = ['MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY']
+        subjects = ['ALGORITMOS', 'BASES DE DATOS', 'REDES DE COMPUTADORAS', 'SISTEMAS OPERATIVOS']
+        schedule_router.courses.get_courses.return_value = [
+            build_course('5CM5' + str(section), subject, day, 0.1 * (section + 1))
+            for subject, day in zip(subjects, days)
+            for section in range(3)
+        ]
+
+        first_page = client.post('/schedules/', json=REQUEST)
+        assert first_page.status_code == 200
+        assert len(first_page.json()) == 20
+        cursor = first_page.headers['X-Next-Cursor']
+
+        second_page = client.post('/schedules/', json={**REQUEST, 'cursor': cursor})
+        assert second_page.status_code == 200
+        assert [schedule['option'] for schedule in second_page.json()] == list(range(20, 40))
+        assert second_page.json()[0]['avg_positive_score'] <= first_page.json()[-1]['avg_positive_score']
+        # La segunda página se sirve sin repetir la consulta de cursos
+        assert schedule_router.courses.get_courses.call_count == 1
+
+    def test_pages_are_ranked_on_demand_without_a_result_cap(self):
+        days = ['MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY']
+        subjects = ['ALGORITMOS', 'BASES DE DATOS', 'REDES DE COMPUTADORAS', 'SISTEMAS OPERATIVOS']
+        schedule_router.courses.get_courses.return_value = [
+            build_course('5CM5' + str(section), subject, day, 0.1 * (section + 1))
+            for subject, day in zip(subjects, days)
+            for section in range(3)
+        ]
+
+        options = []
+        cursor = None
+        with patch.object(
+            ScheduleService, 'refine_schedules', autospec=True, side_effect=ScheduleService.refine_schedules
+        ) as refine:
+            while True:
+                response = client.post('/schedules/', json={**REQUEST, 'cursor': cursor} if cursor else REQUEST)
+                assert response.status_code == 200
+                options += [schedule['option'] for schedule in response.json()]
+                cursor = response.headers.get('X-Next-Cursor')
+                if cursor is None:
+                    break
+
+        # 4 asignaturas de las que se eligen 3, con 3 grupos cada una
+        assert options == list(range(108))
+        # La primera página ordena solo 21 horarios y el ranking se amplía al doble cuando hace falta
+        depths = [query.max_results for (_, _, query), _ in refine.call_args_list]
+        assert depths == [21, 42, 84, 168]
+
+    def test_invalid_cursor_is_rejected(self):
+        response = client.post('/schedules/', json={**REQUEST, 'cursor': 'no-es-un-cursor'})
+
+        assert response.status_code == 400
+
+    def test_solver_stats_reports_pool_usage(self):
+        client.post('/schedules/', json=REQUEST)
+
+        response = client.get('/schedules/solver-stats')
+
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats['completed'] >= 1
+        assert stats['queued'] == 0
+        assert stats['running'] == 0
+
+    def test_identical_requests_are_served_from_cache(self):
+        first = client.post('/schedules/', json=REQUEST)
+        # Misma petición con listas en otro orden y nombres con otro formato
+        second = client.post('/schedules/', json={
+            **REQUEST,
+            'levels': ['5', '5'],
+            'excluded_teachers': ['  profesor  inexistente'],
+        })
+        third = client.post('/schedules/', json={**REQUEST, 'excluded_teachers': ['PROFESOR INEXISTENTE']})
+
+        assert first.json() == second.json() == third.json()
+        assert schedule_router.courses.get_courses.call_count == 2
+
+    def test_cache_is_invalidated_when_courses_change(self):
+        client.post('/schedules/', json=REQUEST)
+        schedule_router.courses.get_data_version.return_value = 2
+        client.post('/schedules/', json=REQUEST)
+
+        assert schedule_router.courses.get_courses.call_count == 2